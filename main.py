@@ -1,19 +1,117 @@
+import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QIcon
-from modules.screenshot_watcher import ScreenshotWatcher
-from modules.ui import ScreenshotAnalyzer
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    if "--tune" in sys.argv:
+        from modules.tuning import main as tune
+        sys.exit(tune([arg for arg in sys.argv[1:] if arg != "--tune"]))
 
-    watcher = ScreenshotWatcher()
+    # An optional image path to open; a running instance takes it instead
+    image_args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    image_path = image_args[0] if image_args else None
+
+    if "--profile" in sys.argv:
+        from modules.profiling import start_profiling
+        profiler = start_profiling()
+
+    diagnostics = "--diagnostics" in sys.argv or os.getenv("OLLAMASPEX_DIAGNOSTICS") == "1"
+    if diagnostics:
+        from modules.perf_overlay import ProfilingApplication
+        app = ProfilingApplication(sys.argv)
+        # --diagnostics-log prints the stats every second without the overlay
+        if "--diagnostics-log" in sys.argv:
+            app.profiler.log = True
+            app.profiler.start()
+    else:
+        app = QApplication(sys.argv)
+
+    # Check for a running instance before paying for the heavier imports
+    from modules.daemon import forward_to_running_instance, InstanceServer, ApiServer
+    if forward_to_running_instance(image_path):
+        sys.exit(0)
+
+    from PyQt5.QtCore import QTimer
+    from modules.screenshot_watcher import ScreenshotWatcher
+    from modules.ui import ScreenshotAnalyzer
+    from modules.archive import get_archive
+    from modules.capture_diff import FollowUpMatcher
+
+    # Keep windows alive while shown or still streaming; they only hide on close
+    windows = []
 
     def on_screenshot_detected(image_path):
+        windows[:] = [window for window in windows if window.isVisible() or window.is_busy()]
         window = ScreenshotAnalyzer(image_path)
+        windows.append(window)
         window.show()
+        window.raise_()
+        window.activateWindow()
+
+    instance_server = InstanceServer()
+    if not instance_server.listen():
+        print("Could not register the single-instance socket")
+    instance_server.image_received.connect(on_screenshot_detected)
+
+    if "--no-api" not in sys.argv:
+        try:
+            api_server = ApiServer()
+            api_server.image_received.connect(on_screenshot_detected)
+            api_server.start()
+        except OSError as e:
+            print(f"API disabled: {e}")
 
-    watcher.screenshot_detected.connect(on_screenshot_detected)
+    # Running diffs, kept alive until they finish
+    matchers = []
+
+    def on_new_capture(image_path):
+        # A recapture of an open conversation's region becomes a follow-up turn.
+        # Only windows with a same-size image are diffed, off the GUI thread.
+        candidates = [window for window in reversed(windows) if window.can_follow_up(image_path)]
+        if not candidates:
+            on_screenshot_detected(image_path)
+            return
+        diffed_paths = [window.image_path for window in candidates]
+        matcher = FollowUpMatcher(image_path, diffed_paths)
+
+        def on_matched(index, region, new_image):
+            if not candidates[index].follow_up(image_path, diffed_paths[index], region, new_image):
+                on_screenshot_detected(image_path)
+
+        matcher.matched.connect(on_matched)
+        matcher.unmatched.connect(lambda: on_screenshot_detected(image_path))
+        matcher.finished.connect(lambda: matchers.remove(matcher))
+        matchers.append(matcher)
+        matcher.start()
+
+    watcher = ScreenshotWatcher()
+    watcher.screenshot_detected.connect(on_new_capture)
     watcher.start()
 
+    # Compaction and retention run on the archive's pool, at start and hourly
+    archive = get_archive()
+    archive.schedule_maintenance(watcher.directory)
+    maintenance_timer = QTimer()
+    maintenance_timer.timeout.connect(lambda: archive.schedule_maintenance(watcher.directory))
+    maintenance_timer.start(60 * 60 * 1000)
+
+    if image_path:
+        on_screenshot_detected(os.path.abspath(image_path))
+
+    if "--profile" in sys.argv:
+        import atexit
+        import signal
+        # Windows only hide on close, so a profiled run usually ends with
+        # Ctrl+C or a kill; those quit the event loop and the report is
+        # written on the way out
+        atexit.register(profiler.dump)
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *args: app.quit())
+        # Python only handles signals when it gets to run, which the Qt event
+        # loop otherwise never lets it do
+        signal_timer = QTimer()
+        signal_timer.timeout.connect(lambda: None)
+        signal_timer.start(200)
+
     sys.exit(app.exec_())
@@ -0,0 +1,229 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.expanduser("~"), ".ollamaspex", "archive"))
+THUMBNAIL_SIZE = int(os.getenv("ARCHIVE_THUMBNAIL_SIZE", "256"))
+# Retention; 0 turns a rule off. Deleting from the watched folder is opt-in.
+WATCHED_RETENTION_DAYS = float(os.getenv("WATCHED_RETENTION_DAYS", "0"))
+ARCHIVE_COMPACT_DAYS = float(os.getenv("ARCHIVE_COMPACT_DAYS", "0"))
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "90"))
+ARCHIVE_MAX_MB = float(os.getenv("ARCHIVE_MAX_MB", "500"))
+COMPACT_QUALITY = 85
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
+DAY = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    sha1 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    session TEXT,
+    captured_at REAL,
+    analyzed_at REAL,
+    thumbnail TEXT,
+    compacted INTEGER DEFAULT 0
+)
+"""
+
+
+def in_directory(path, directory):
+    try:
+        return os.path.commonpath([os.path.realpath(path), os.path.realpath(directory)]) == \
+            os.path.realpath(directory)
+    except ValueError:
+        # Different drives on Windows
+        return False
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as image_file:
+        for block in iter(lambda: image_file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RecordTask(QRunnable):
+    def __init__(self, archive, path, session):
+        super().__init__()
+        self.archive = archive
+        self.path = path
+        self.session = session
+
+    def run(self):
+        try:
+            sha1 = self.archive.index(self.path, self.session)
+            if sha1:
+                self.make_thumbnail(sha1)
+        except Exception as e:
+            print(f"Archiving {self.path} failed: {e}")
+
+    def make_thumbnail(self, sha1):
+        reader = QImageReader(self.path)
+        size = reader.size()
+        if size.isValid():
+            # Decode straight to thumbnail size where the format allows it
+            reader.setScaledSize(size.scaled(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE), Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return
+        thumbnail = os.path.join(self.archive.thumbnail_dir, f"{sha1}.jpg")
+        if image.save(thumbnail, "JPG", 80):
+            self.archive.execute("UPDATE captures SET thumbnail = ? WHERE sha1 = ?", (thumbnail, sha1))
+            self.archive.thumbnail_ready.emit(sha1, thumbnail)
+
+
+class MaintenanceTask(QRunnable):
+    def __init__(self, archive, watched_dir):
+        super().__init__()
+        self.archive = archive
+        self.watched_dir = watched_dir
+
+    def run(self):
+        try:
+            self.archive.maintain(self.watched_dir)
+        except Exception as e:
+            print(f"Archive maintenance failed: {e}")
+
+
+class ScreenshotArchive(QObject):
+    # Index of analyzed captures with a thumbnail cache; thumbnailing,
+    # compaction and retention run on a background pool.
+    thumbnail_ready = pyqtSignal(str, str)
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        super().__init__()
+        self.directory = directory
+        self.thumbnail_dir = os.path.join(directory, "thumbnails")
+        self.originals_dir = os.path.join(directory, "originals")
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        os.makedirs(self.originals_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self.db.execute(SCHEMA)
+        self.db.commit()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(2)
+
+    def execute(self, query, parameters=()):
+        with self.lock:
+            rows = self.db.execute(query, parameters).fetchall()
+            self.db.commit()
+            return rows
+
+    def record(self, path, session):
+        # Called when a capture is sent for analysis; hashing and thumbnailing
+        # happen on the pool, off the GUI thread
+        if path and os.path.isfile(path):
+            self.pool.start(RecordTask(self, path, session))
+
+    def index(self, path, session):
+        # Returns the capture's hash when it still needs a thumbnail
+        sha1 = file_sha1(path)
+        now = time.time()
+        existing = self.execute("SELECT thumbnail FROM captures WHERE sha1 = ?", (sha1,))
+        if existing:
+            self.execute("UPDATE captures SET analyzed_at = ?, session = ? WHERE sha1 = ?", (now, session, sha1))
+            if existing[0][0] and os.path.isfile(existing[0][0]):
+                return None
+        else:
+            size = QImageReader(path).size()
+            self.execute(
+                "INSERT INTO captures (sha1, path, size, width, height, session, captured_at, analyzed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha1, os.path.abspath(path), os.path.getsize(path), size.width(), size.height(),
+                 session, os.path.getmtime(path), now))
+        return sha1
+
+    def recent(self, limit=50):
+        return self.execute(
+            "SELECT sha1, path, thumbnail, session, analyzed_at FROM captures ORDER BY analyzed_at DESC LIMIT ?",
+            (limit,))
+
+    def schedule_maintenance(self, watched_dir):
+        self.pool.start(MaintenanceTask(self, watched_dir))
+
+    def compact(self, sha1, path):
+        image = QImage(path)
+        if image.isNull():
+            return None
+        target = os.path.join(self.originals_dir, f"{sha1}.jpg")
+        if not image.save(target, "JPG", COMPACT_QUALITY):
+            return None
+        self.execute("UPDATE captures SET path = ?, size = ?, compacted = 1 WHERE sha1 = ?",
+                     (target, os.path.getsize(target), sha1))
+        os.remove(path)
+        return target
+
+    def maintain(self, watched_dir):
+        now = time.time()
+        watched = bool(watched_dir) and os.path.isdir(watched_dir)
+        # Old analyzed captures are re-encoded into the archive. Only files in
+        # the watched folder; images opened from anywhere else are the user's.
+        if ARCHIVE_COMPACT_DAYS and watched:
+            for sha1, path in self.execute(
+                    "SELECT sha1, path FROM captures WHERE compacted = 0 AND captured_at < ?",
+                    (now - ARCHIVE_COMPACT_DAYS * DAY,)):
+                if os.path.isfile(path) and in_directory(path, watched_dir):
+                    self.compact(sha1, path)
+
+        if WATCHED_RETENTION_DAYS and watched:
+            indexed = {os.path.realpath(path): sha1
+                       for sha1, path in self.execute("SELECT sha1, path FROM captures WHERE compacted = 0")}
+            cutoff = now - WATCHED_RETENTION_DAYS * DAY
+            for entry in os.scandir(watched_dir):
+                if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                # Keep a compact copy of analyzed captures before removing them
+                sha1 = indexed.get(os.path.realpath(entry.path))
+                if sha1 and self.compact(sha1, entry.path):
+                    continue
+                os.remove(entry.path)
+
+        if ARCHIVE_RETENTION_DAYS:
+            for row in self.execute("SELECT sha1, path, thumbnail, compacted FROM captures WHERE analyzed_at < ?",
+                                    (now - ARCHIVE_RETENTION_DAYS * DAY,)):
+                self.forget(*row)
+
+        if ARCHIVE_MAX_MB:
+            total = sum(self.archived_bytes(thumbnail, path if compacted else None)
+                        for _, path, thumbnail, compacted in self.all_rows())
+            for row in self.all_rows():
+                if total <= ARCHIVE_MAX_MB * 1e6:
+                    break
+                _, path, thumbnail, compacted = row
+                total -= self.archived_bytes(thumbnail, path if compacted else None)
+                self.forget(*row)
+
+    def all_rows(self):
+        # Oldest first
+        return self.execute("SELECT sha1, path, thumbnail, compacted FROM captures ORDER BY analyzed_at ASC")
+
+    def archived_bytes(self, *paths):
+        return sum(os.path.getsize(path) for path in paths if path and os.path.isfile(path))
+
+    def forget(self, sha1, path, thumbnail, compacted):
+        # Only files the archive owns are deleted; originals stay in the watched folder
+        for owned in (thumbnail, path if compacted else None):
+            if owned and os.path.isfile(owned):
+                os.remove(owned)
+        self.execute("DELETE FROM captures WHERE sha1 = ?", (sha1,))
+
+
+_archive = None
+
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        _archive = ScreenshotArchive()
+    return _archive
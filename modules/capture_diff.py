@@ -0,0 +1,130 @@
+import os
+from PyQt5.QtCore import QRect, QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+from .profiling import name_current_thread
+
+DIFF_FOLLOW_UP = os.getenv("DIFF_FOLLOW_UP", "1") == "1"
+# A change covering more than this share of the image is treated as a new capture
+MAX_CHANGED_FRACTION = float(os.getenv("DIFF_MAX_CHANGED_FRACTION", "0.6"))
+# Context kept around the changed box, in pixels
+DIFF_MARGIN = 24
+
+FOLLOW_UP_PROMPT = (
+    "The same region was captured again. Only the area at x={x}..{x2}, y={y}..{y2} "
+    "of the {width}x{height} capture changed; this image is that area as it looks now. "
+    "Describe what changed compared to the earlier screenshot."
+)
+
+
+def same_size(old_path, new_path):
+    # Reads only the image headers, so it is cheap enough for the GUI thread
+    size = QImageReader(old_path).size()
+    return size.isValid() and size == QImageReader(new_path).size()
+
+
+def load_rgb32(path):
+    image = QImage(path)
+    if image.isNull():
+        return None
+    return image.convertToFormat(QImage.Format_RGB32)
+
+
+def _first_difference(a, b):
+    # Binary search on slice equality keeps the byte comparisons in C
+    low, high = 0, len(a)
+    while low < high:
+        middle = (low + high) // 2
+        if a[:middle + 1] == b[:middle + 1]:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _last_difference(a, b):
+    length = len(a)
+    low, high = 0, length
+    while low < high:
+        middle = (low + high) // 2
+        if a[length - middle - 1:] == b[length - middle - 1:]:
+            low = middle + 1
+        else:
+            high = middle
+    return length - low - 1
+
+
+def changed_region(old_image, new_image):
+    # Bounding box of the pixels that differ, None when identical.
+    # Both images must be Format_RGB32 and the same size.
+    width, height = old_image.width(), old_image.height()
+    stride = old_image.bytesPerLine()
+    old_bits = old_image.constBits()
+    old_bits.setsize(old_image.sizeInBytes())
+    new_bits = new_image.constBits()
+    new_bits.setsize(new_image.sizeInBytes())
+    old_data = bytes(old_bits)
+    new_data = bytes(new_bits)
+    if old_data == new_data:
+        return None
+
+    top = bottom = None
+    left, right = width, -1
+    row_bytes = width * 4
+    for y in range(height):
+        start = y * stride
+        old_row = old_data[start:start + row_bytes]
+        new_row = new_data[start:start + row_bytes]
+        if old_row == new_row:
+            continue
+        if top is None:
+            top = y
+        bottom = y
+        left = min(left, _first_difference(old_row, new_row) // 4)
+        right = max(right, _last_difference(old_row, new_row) // 4)
+    if top is None:
+        return None
+    return QRect(left, top, right - left + 1, bottom - top + 1)
+
+
+def follow_up_region(old_path, new_path, new_image=None):
+    # The padded changed box when new_path is an update of old_path, else None.
+    # new_image can be passed in when one capture is compared to several paths.
+    if not same_size(old_path, new_path):
+        return None, None
+    old_image = load_rgb32(old_path)
+    if new_image is None:
+        new_image = load_rgb32(new_path)
+    if old_image is None or new_image is None or old_image.size() != new_image.size():
+        return None, None
+    region = changed_region(old_image, new_image)
+    if region is None:
+        return None, None
+    if region.width() * region.height() > MAX_CHANGED_FRACTION * new_image.width() * new_image.height():
+        return None, None
+    region = region.adjusted(-DIFF_MARGIN, -DIFF_MARGIN, DIFF_MARGIN, DIFF_MARGIN).intersected(new_image.rect())
+    return region, new_image
+
+
+class FollowUpMatcher(QThread):
+    # Diffs a new capture against the images of open conversations off the
+    # GUI thread. Emits the index of the first one it updates, else unmatched.
+    matched = pyqtSignal(int, object, object)
+    unmatched = pyqtSignal()
+
+    def __init__(self, new_path, old_paths):
+        super().__init__()
+        self.new_path = new_path
+        self.old_paths = old_paths
+
+    def run(self):
+        name_current_thread("FollowUpMatcher")
+        try:
+            new_image = load_rgb32(self.new_path)
+            for index, old_path in enumerate(self.old_paths):
+                region, image = follow_up_region(old_path, self.new_path, new_image)
+                if region is not None:
+                    self.matched.emit(index, region, image)
+                    return
+        except Exception as e:
+            print(f"Comparing {self.new_path} failed: {e}")
+        self.unmatched.emit()
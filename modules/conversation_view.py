@@ -0,0 +1,277 @@
+import html
+from collections import OrderedDict
+import markdown
+import pyperclip
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QTimer
+from PyQt5.QtGui import QTextDocument, QAbstractTextDocumentLayout, QColor, QPalette, QKeySequence
+from PyQt5.QtWidgets import (QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QMenu, QAction,
+                             QTextBrowser, QFrame)
+
+USER_ROLE = "user"
+AI_ROLE = "assistant"
+
+MessageRole = Qt.UserRole + 1
+VersionRole = Qt.UserRole + 2
+
+MESSAGE_CSS = "ol, ul { padding-left: 2em; } p { margin: 0; } pre, code { font-family: Consolas, monospace; }"
+
+
+class ConversationModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.messages = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message['text']
+        if role == MessageRole:
+            return message['role']
+        if role == VersionRole:
+            return message['version']
+        return None
+
+    def flags(self, index):
+        # "Editable" only so the view can open the read-only text browser
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def append_message(self, role, text):
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append({'role': role, 'text': text, 'version': 0})
+        self.endInsertRows()
+        return row
+
+    def append_to_last(self, chunk):
+        if not self.messages:
+            return
+        message = self.messages[-1]
+        message['text'] += chunk
+        message['version'] += 1
+
+    def last_changed(self):
+        # Chunks are appended silently; the view reports them once per relayout
+        if self.messages:
+            index = self.index(len(self.messages) - 1)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def clear(self):
+        self.beginResetModel()
+        self.messages = []
+        self.endResetModel()
+
+
+class MessageDelegate(QStyledItemDelegate):
+    # Rendered documents are kept only for recently painted rows; everything
+    # else is just the message text plus a cached height.
+    MAX_CACHED_DOCUMENTS = 48
+    PADDING = 8
+    SPACING = 4
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.documents = OrderedDict()
+        self.sizes = {}
+
+    def clear_cache(self):
+        self.documents.clear()
+        self.sizes.clear()
+
+    def text_width(self):
+        return max(50, self.view.viewport().width() - 2 * self.PADDING)
+
+    def message_html(self, role, text):
+        if role == USER_ROLE:
+            body = html.escape(text).replace("\n", "<br>")
+            return f"<b style='color: #ffffff;'>{role.upper()}</b>: {body}"
+        return f"<b style='color: #6a9eda;'>{role.upper()}</b>: {markdown.markdown(text)}"
+
+    def document(self, index):
+        row = index.row()
+        version = index.data(VersionRole)
+        width = self.text_width()
+        cached = self.documents.get(row)
+        if cached is not None and cached[0] == version and cached[1] == width:
+            self.documents.move_to_end(row)
+            return cached[2]
+        doc = QTextDocument()
+        doc.setDefaultFont(self.view.font())
+        doc.setDefaultStyleSheet(MESSAGE_CSS)
+        doc.setDocumentMargin(0)
+        doc.setHtml(self.message_html(index.data(MessageRole), index.data(Qt.DisplayRole)))
+        doc.setTextWidth(width)
+        self.documents[row] = (version, width, doc)
+        self.documents.move_to_end(row)
+        while len(self.documents) > self.MAX_CACHED_DOCUMENTS:
+            self.documents.popitem(last=False)
+        self.sizes[row] = (version, width, doc.size().height())
+        return doc
+
+    def plain_text(self, index):
+        # What the message looks like on screen, without markdown syntax
+        return self.document(index).toPlainText()
+
+    def createEditor(self, parent, option, index):
+        # A read-only browser over one message, for selecting any span of it
+        editor = QTextBrowser(parent)
+        editor.setFrameShape(QFrame.NoFrame)
+        editor.setOpenExternalLinks(True)
+        editor.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        editor.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        editor.setFont(self.view.font())
+        editor.document().setDefaultStyleSheet(MESSAGE_CSS)
+        editor.document().setDocumentMargin(0)
+        background = "#2d5c8a" if index.data(MessageRole) == USER_ROLE else "#333333"
+        editor.setStyleSheet(f"QTextBrowser {{ background-color: {background}; color: #e0e0e0; border: none; }}")
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setHtml(self.message_html(index.data(MessageRole), index.data(Qt.DisplayRole)))
+
+    def setModelData(self, editor, model, index):
+        pass
+
+    def updateEditorGeometry(self, editor, option, index):
+        rect = option.rect.adjusted(0, self.SPACING // 2, 0, -self.SPACING // 2)
+        editor.setGeometry(rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING))
+
+    def sizeHint(self, option, index):
+        row = index.row()
+        version = index.data(VersionRole)
+        width = self.text_width()
+        cached = self.sizes.get(row)
+        if cached is not None and cached[0] == version and cached[1] == width:
+            height = cached[2]
+        else:
+            height = self.document(index).size().height()
+        return QSize(self.view.viewport().width(), int(height) + 2 * self.PADDING + self.SPACING)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect.adjusted(0, self.SPACING // 2, 0, -self.SPACING // 2)
+        background = QColor("#2d5c8a") if index.data(MessageRole) == USER_ROLE else QColor("#333333")
+        painter.setRenderHint(painter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(rect), 6, 6)
+        if option.state & QStyle.State_Selected:
+            painter.setBrush(QColor(255, 255, 255, 40))
+            painter.drawRoundedRect(QRectF(rect), 6, 6)
+
+        doc = self.document(index)
+        painter.translate(rect.left() + self.PADDING, rect.top() + self.PADDING)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.Text, QColor("#e0e0e0"))
+        doc.documentLayout().draw(painter, context)
+        painter.restore()
+
+
+class ConversationView(QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.conversation_model = ConversationModel(self)
+        self.setModel(self.conversation_model)
+        self.delegate = MessageDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # Clicking a selected message (or double-clicking one) opens it for text selection
+        self.setEditTriggers(QAbstractItemView.SelectedClicked | QAbstractItemView.DoubleClicked)
+        self.setWordWrap(True)
+        self.conversation_model.modelReset.connect(self.delegate.clear_cache)
+
+        # Coalesce repaints and relayouts while a reply is streaming in
+        self._relayout_timer = QTimer(self)
+        self._relayout_timer.setSingleShot(True)
+        self._relayout_timer.setInterval(30)
+        self._relayout_timer.timeout.connect(self._relayout_last)
+        self._follow_bottom = True
+
+        copy_action = QAction("Copy", self)
+        copy_action.setShortcut(QKeySequence.Copy)
+        copy_action.setShortcutContext(Qt.WidgetWithChildrenShortcut)
+        copy_action.triggered.connect(self.copy_selection)
+        self.addAction(copy_action)
+
+    def append_message(self, role, text):
+        self._follow_bottom = self.is_at_bottom()
+        self.conversation_model.append_message(role, text)
+        self.scroll_to_bottom()
+
+    def append_to_last(self, chunk):
+        self.conversation_model.append_to_last(chunk)
+        # Not restarted per chunk, so a fast stream still updates every interval
+        if not self._relayout_timer.isActive():
+            self._follow_bottom = self.is_at_bottom()
+            self._relayout_timer.start()
+
+    def _relayout_last(self):
+        # Only the last row changed; the others come from the height cache.
+        # Re-rendering its markdown once per interval, not once per chunk.
+        row = self.conversation_model.rowCount() - 1
+        if row < 0:
+            return
+        self.conversation_model.last_changed()
+        self.delegate.sizeHintChanged.emit(self.conversation_model.index(row))
+        self.scroll_to_bottom()
+
+    def clear(self):
+        self.conversation_model.clear()
+
+    def is_at_bottom(self):
+        bar = self.verticalScrollBar()
+        return bar.value() >= bar.maximum() - 4
+
+    def scroll_to_bottom(self):
+        if self._follow_bottom:
+            QTimer.singleShot(0, self.scrollToBottom)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if event.size().width() != event.oldSize().width():
+            self.delegate.clear_cache()
+            self.scheduleDelayedItemsLayout()
+
+    def selected_text(self):
+        indexes = sorted(self.selectedIndexes(), key=lambda index: index.row())
+        return "\n\n".join(self.delegate.plain_text(index) for index in indexes)
+
+    def all_text(self):
+        model = self.conversation_model
+        return "\n\n".join(self.delegate.plain_text(model.index(row)) for row in range(model.rowCount()))
+
+    def copy_selection(self):
+        text = self.selected_text()
+        if text:
+            pyperclip.copy(text)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        index = self.indexAt(event.pos())
+
+        copy_message = QAction("Copy Message", self)
+        copy_message.setEnabled(index.isValid())
+        copy_message.triggered.connect(lambda: pyperclip.copy(self.delegate.plain_text(index)))
+
+        copy_selected = QAction("Copy Selected", self)
+        copy_selected.setEnabled(bool(self.selectedIndexes()))
+        copy_selected.triggered.connect(self.copy_selection)
+
+        copy_all = QAction("Copy Conversation", self)
+        copy_all.triggered.connect(lambda: pyperclip.copy(self.all_text()))
+
+        menu.addAction(copy_message)
+        menu.addAction(copy_selected)
+        menu.addAction(copy_all)
+        menu.exec_(event.globalPos())
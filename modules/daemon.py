@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from .local_generate import stream_chat, SYSTEM_MESSAGE, DEFAULT_MODEL
+from .routing import get_router, AUTO_MODEL
+
+INSTANCE_NAME = "ollamaspex"
+API_HOST = "127.0.0.1"
+API_PORT = int(os.getenv("OLLAMASPEX_API_PORT", "8765"))
+
+
+def forward_to_running_instance(image_path, timeout_ms=500):
+    # Returns True when another instance took the image
+    socket = QLocalSocket()
+    socket.connectToServer(INSTANCE_NAME)
+    if not socket.waitForConnected(timeout_ms):
+        return False
+    socket.write((json.dumps({'image_path': os.path.abspath(image_path) if image_path else None}) + "\n").encode())
+    socket.waitForBytesWritten(timeout_ms)
+    socket.disconnectFromServer()
+    return True
+
+
+class InstanceServer(QObject):
+    image_received = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self):
+        if not self.server.listen(INSTANCE_NAME):
+            # A crashed instance can leave its socket behind
+            QLocalServer.removeServer(INSTANCE_NAME)
+            return self.server.listen(INSTANCE_NAME)
+        return True
+
+    def _on_connection(self):
+        socket = self.server.nextPendingConnection()
+        socket.readyRead.connect(lambda: self._on_ready_read(socket))
+        socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket):
+        while socket.canReadLine():
+            try:
+                message = json.loads(bytes(socket.readLine()).decode())
+            except ValueError:
+                continue
+            if message.get('image_path'):
+                self.image_received.emit(message['image_path'])
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # POST /analyze  {"image_path" | "image_base64", "prompt", "model"?, "show"?}
+    # streams back newline-delimited JSON: {"content": ...} ... {"done": true, "response": ...}
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self._send_json(404, {'error': 'not found'})
+            return
+        # Browsers can send text/plain and form posts cross-site without a
+        # preflight; requiring JSON and no Origin keeps web pages out
+        if self.headers.get('Origin'):
+            self._send_json(403, {'error': 'browser requests are not accepted'})
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self._send_json(415, {'error': 'Content-Type must be application/json'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON'})
+            return
+
+        image = request.get('image_base64') or request.get('image_path')
+        prompt = request.get('prompt')
+        if not image or not prompt:
+            self._send_json(400, {'error': 'image_path or image_base64, and prompt are required'})
+            return
+        if request.get('image_path') and not os.path.isfile(request['image_path']):
+            self._send_json(400, {'error': f"no such file: {request['image_path']}"})
+            return
+        if request.get('show') and request.get('image_path'):
+            self.server.api.image_received.emit(os.path.abspath(request['image_path']))
+
+        memory = [
+            {'role': 'system', 'content': SYSTEM_MESSAGE},
+            {'role': 'user', 'content': prompt, 'images': [image]},
+        ]
+        model = request.get('model') or os.getenv("LLM_MODEL_ID")
+        if model == AUTO_MODEL:
+            # The GUI's "auto" choice is saved as LLM_MODEL_ID; route it here too
+            router = get_router()
+            model, _, _ = router.route(prompt, list(router.refresh_sizes()),
+                                       target=float(os.getenv("ROUTING_LATENCY_TARGET", "8")))
+            # No model list from the server: fall back like the GUI does
+            model = model or DEFAULT_MODEL
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        response = ""
+        try:
+            for chunk in stream_chat(memory, model):
+                content = chunk['message']['content']
+                if content:
+                    response += content
+                    self._write_line({'content': content})
+            self._write_line({'done': True, 'response': response})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self._write_line({'done': True, 'error': str(e)})
+
+    def _write_line(self, payload):
+        self.wfile.write((json.dumps(payload) + "\n").encode())
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ApiServer(QObject):
+    # Local-only HTTP API served from a background thread
+    image_received = pyqtSignal(str)
+
+    def __init__(self, host=API_HOST, port=API_PORT, parent=None):
+        super().__init__(parent)
+        self.httpd = ThreadingHTTPServer((host, port), ApiHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"API listening on http://{self.httpd.server_address[0]}:{self.httpd.server_address[1]}")
+
+    def stop(self):
+        self.httpd.shutdown()
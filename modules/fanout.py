@@ -0,0 +1,159 @@
+import time
+from PyQt5.QtCore import QObject, pyqtSignal, Qt
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLabel
+from .local_generate import Worker_Local
+from .conversation_view import ConversationView, AI_ROLE
+
+COMPARE = "compare"
+HEDGE_FIRST_TOKEN = "first_token"
+HEDGE_FIRST_FINISH = "first_finish"
+
+
+def target_name(target):
+    model, host = target
+    return f"{model} @ {host}" if host else model
+
+
+class FanoutController(QObject):
+    # Sends one question to several (model, host) targets at once
+    target_partial = pyqtSignal(int, str)
+    target_stats = pyqtSignal(int, dict)
+    target_finished = pyqtSignal(int, str)
+    target_error = pyqtSignal(int, str)
+    winner = pyqtSignal(int)
+    all_done = pyqtSignal()
+
+    def __init__(self, targets, memory, api_key, mode=COMPARE, parent=None):
+        super().__init__(parent)
+        self.targets = targets
+        self.mode = mode
+        self.workers = []
+        self.stats = []
+        self.winner_index = None
+        self.pending = len(targets)
+        for index, (model, host) in enumerate(targets):
+            # Each worker gets its own copy; the caller appends to memory later
+            worker = Worker_Local(list(memory), api_key, model, host=host)
+            worker.partial.connect(lambda chunk, i=index: self._on_partial(i, chunk))
+            worker.finished.connect(lambda response, i=index: self._on_finished(i, response))
+            worker.error.connect(lambda error, i=index: self._on_error(i, error))
+            self.workers.append(worker)
+            self.stats.append({'ttft': None, 'chunks': 0, 'elapsed': 0.0, 'rate': 0.0, 'done': False})
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        for worker in self.workers:
+            worker.start()
+
+    def cancel(self, keep=None):
+        for index, worker in enumerate(self.workers):
+            if index != keep and not self.stats[index]['done']:
+                worker.cancel()
+                self.stats[index]['done'] = True
+                self._mark_done()
+
+    def _mark_done(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.all_done.emit()
+
+    def _update_stats(self, index):
+        stats = self.stats[index]
+        stats['elapsed'] = time.perf_counter() - self.started_at
+        decode_time = stats['elapsed'] - (stats['ttft'] or 0.0)
+        # Ollama streams roughly one token per chunk
+        stats['rate'] = stats['chunks'] / decode_time if decode_time > 0 else 0.0
+        self.target_stats.emit(index, dict(stats))
+
+    def _pick_winner(self, index):
+        if self.winner_index is None:
+            self.winner_index = index
+            self.winner.emit(index)
+            self.cancel(keep=index)
+
+    def _on_partial(self, index, chunk):
+        if self.stats[index]['done']:
+            return
+        stats = self.stats[index]
+        if stats['ttft'] is None:
+            stats['ttft'] = time.perf_counter() - self.started_at
+            if self.mode == HEDGE_FIRST_TOKEN:
+                self._pick_winner(index)
+        stats['chunks'] += 1
+        self._update_stats(index)
+        self.target_partial.emit(index, chunk)
+
+    def _on_finished(self, index, response):
+        if self.stats[index]['done']:
+            return
+        if self.mode == HEDGE_FIRST_FINISH:
+            self._pick_winner(index)
+        self._update_stats(index)
+        self.stats[index]['done'] = True
+        self.target_finished.emit(index, response)
+        self._mark_done()
+
+    def _on_error(self, index, error):
+        if self.stats[index]['done']:
+            return
+        self.stats[index]['done'] = True
+        self.target_error.emit(index, error)
+        self._mark_done()
+
+
+class FanoutWindow(QWidget):
+    # Side-by-side streams of a compare run
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Compare Models")
+        self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+        self.resize(1200, 600)
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(10, 10, 10, 10)
+        self.layout.setSpacing(8)
+        self.columns = []
+
+    def attach(self, controller, question):
+        while self.layout.count():
+            item = self.layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        self.columns = []
+        for target in controller.targets:
+            column = QWidget()
+            columnLayout = QVBoxLayout(column)
+            columnLayout.setContentsMargins(0, 0, 0, 0)
+            title = QLabel(f"<b>{target_name(target)}</b>")
+            stats = QLabel("waiting...")
+            stats.setStyleSheet("color: #a0a0a0;")
+            view = ConversationView()
+            columnLayout.addWidget(title)
+            columnLayout.addWidget(stats)
+            columnLayout.addWidget(view, 1)
+            self.layout.addWidget(column, 1)
+            self.columns.append({'stats': stats, 'view': view, 'started': False})
+        self.setWindowTitle(f"Compare Models - {question[:60]}")
+        controller.target_partial.connect(self.on_partial)
+        controller.target_stats.connect(self.on_stats)
+        controller.target_finished.connect(self.on_finished)
+        controller.target_error.connect(self.on_error)
+
+    def on_partial(self, index, chunk):
+        column = self.columns[index]
+        if column['started']:
+            column['view'].append_to_last(chunk)
+        else:
+            column['view'].append_message(AI_ROLE, chunk)
+            column['started'] = True
+
+    def on_stats(self, index, stats):
+        ttft = f"{stats['ttft']:.2f}s" if stats['ttft'] is not None else "-"
+        self.columns[index]['stats'].setText(
+            f"first token {ttft} · {stats['rate']:.1f} tok/s · {stats['elapsed']:.1f}s")
+
+    def on_finished(self, index, response):
+        label = self.columns[index]['stats']
+        label.setText(label.text() + " · done")
+
+    def on_error(self, index, error):
+        self.columns[index]['stats'].setText(f"<span style='color: #ff6b6b;'>error: {error}</span>")
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+# Must be set before Qt and the ollama client are imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtWidgets import QApplication
+
+FRAME_MS = 1000 / 60
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class FrameMonitor:
+    # Counts 60 Hz frames the event loop was too busy to service
+    def __init__(self):
+        self.dropped = 0
+        self.ticks = 0
+        self.worst_ms = 0.0
+        self.last = time.perf_counter()
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start(int(FRAME_MS))
+
+    def tick(self):
+        now = time.perf_counter()
+        elapsed_ms = (now - self.last) * 1000
+        self.last = now
+        self.ticks += 1
+        self.worst_ms = max(self.worst_ms, elapsed_ms)
+        self.dropped += max(0, int(elapsed_ms / FRAME_MS) - 1)
+
+
+def rss_mb():
+    try:
+        import resource
+        # ru_maxrss is KB on Linux, bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    except ImportError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive N screenshots through the app against the replay server")
+    parser.add_argument("-n", "--screenshots", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between captures")
+    parser.add_argument("--fixtures", default=os.path.abspath(os.getenv("REPLAY_FIXTURE_DIR", "fixtures")))
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--abort-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    parser.add_argument("--question", default="What does this screenshot show?")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    # Imported before OLLAMA_HOST is set; it does not read it at import time
+    from .replay import start_replay_server
+    server = start_replay_server(fixture_dir=args.fixtures, speed=args.speed, error_rate=args.error_rate,
+                                 abort_rate=args.abort_rate, stall_rate=args.stall_rate,
+                                 stall_seconds=args.stall_seconds)
+    models = server.models()
+    if not models:
+        print(f"No /api/chat fixtures in {args.fixtures}; record some with `python -m modules.replay record`")
+        return 1
+    os.environ["OLLAMA_HOST"] = f"127.0.0.1:{server.server_address[1]}"
+    os.environ["LLM_MODEL_ID"] = models[0]
+
+    # Keep .env writes, stats files and the archive away from the real ones;
+    # ARCHIVE_DIR is read when modules.ui imports the archive
+    workdir = tempfile.mkdtemp(prefix="ollamaspex-load-")
+    watched = os.path.join(workdir, "Screenshots")
+    os.makedirs(watched)
+    os.environ["ARCHIVE_DIR"] = os.path.join(workdir, "archive")
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    app = QApplication(sys.argv[:1])
+    from .screenshot_watcher import ScreenshotWatcher
+    from .ui import ScreenshotAnalyzer
+    from .tuning import synthetic_screenshot
+    from .archive import get_archive
+
+    tracemalloc.start()
+    memory_start = tracemalloc.get_traced_memory()[0]
+    rss_start = rss_mb()
+
+    template = synthetic_screenshot(os.path.join(workdir, "template.png"))
+    with open(template, "rb") as template_file:
+        image_bytes = template_file.read()
+
+    written = {}
+    results = {'latency': [], 'ttft': [], 'errors': 0}
+    windows = []
+    monitor = FrameMonitor()
+
+    def finish():
+        app.quit()
+
+    def check_done():
+        if len(results['latency']) + results['errors'] >= args.screenshots:
+            QTimer.singleShot(0, finish)
+
+    def on_screenshot(path):
+        window = ScreenshotAnalyzer(path)
+        # Modal boxes would block the run; count them instead
+        window.show_message = lambda message: None
+
+        def on_error(error):
+            results['errors'] += 1
+            print(f"error: {error}")
+            check_done()
+        window.show_error_message = on_error
+        window.show()
+        windows.append(window)
+        window.entry.setText(args.question)
+        window.send_text()
+        worker = window.worker_reference
+
+        def on_partial(chunk, path=path):
+            if path not in first_token:
+                first_token[path] = time.perf_counter()
+
+        def on_finished(response, path=path):
+            results['latency'].append(time.perf_counter() - written[path])
+            if path in first_token:
+                results['ttft'].append(first_token[path] - written[path])
+            check_done()
+        worker.partial.connect(on_partial)
+        worker.finished.connect(on_finished)
+
+    first_token = {}
+    watcher = ScreenshotWatcher()
+    watcher.directory = watched
+    watcher.screenshot_detected.connect(on_screenshot)
+    watcher.start()
+
+    pending = list(range(args.screenshots))
+
+    def write_next():
+        if not pending:
+            return
+        index = pending.pop(0)
+        path = os.path.join(watched, f"capture_{index:04d}.png")
+        with open(path, "wb") as capture:
+            capture.write(image_bytes)
+        written[path] = time.perf_counter()
+        QTimer.singleShot(int(args.interval * 1000), write_next)
+
+    QTimer.singleShot(500, write_next)
+    QTimer.singleShot(int(args.timeout * 1000), finish)
+    monitor.start()
+    started = time.perf_counter()
+    app.exec_()
+    duration = time.perf_counter() - started
+
+    memory_end = tracemalloc.get_traced_memory()[0]
+    rss_end = rss_mb()
+    watcher.terminate()
+    server.shutdown()
+    get_archive().pool.waitForDone()
+    os.chdir(original_cwd)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    completed = len(results['latency'])
+    print(f"Screenshots: {args.screenshots}, completed {completed}, errors {results['errors']}, "
+          f"timed out {args.screenshots - completed - results['errors']}")
+    print("Note: latency includes the watcher's 1 s polling interval")
+    for label, values in (("End-to-end", results['latency']), ("First token", results['ttft'])):
+        print(f"{label} latency: p50 {percentile(values, 0.5):.2f}s  p90 {percentile(values, 0.9):.2f}s  "
+              f"p99 {percentile(values, 0.99):.2f}s  max {max(values, default=0.0):.2f}s")
+    print(f"UI frames: {monitor.dropped} dropped of {int(duration * 1000 / FRAME_MS)}, "
+          f"worst stall {monitor.worst_ms:.0f} ms")
+    print(f"Python heap growth: {(memory_end - memory_start) / 1e6:.1f} MB")
+    if rss_start is not None:
+        print(f"Peak RSS: {rss_start:.0f} MB -> {rss_end:.0f} MB")
+    return 0 if completed == args.screenshots else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
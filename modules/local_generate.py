@@ -1,27 +1,109 @@
+import time
+import socket
 from PyQt5.QtCore import QThread, pyqtSignal
-from ollama import chat
+from ollama import Client
+from .tuning import generation_kwargs
+from .profiling import name_current_thread
+
+DEFAULT_MODEL = 'gemma3:latest'
+SYSTEM_MESSAGE = 'You are an AI assistant analyzing images. Provide detailed and accurate descriptions of the image contents.'
+
+# One client (and so one HTTP connection pool) per host for requests that are
+# never cancelled; Worker_Local makes its own
+_clients = {}
+
+
+def get_client(host=None):
+    client = _clients.get(host)
+    if client is None:
+        client = _clients[host] = Client(host=host) if host else Client()
+    return client
+
+
+def stream_chat(memory, model, host=None, client=None):
+    model = DEFAULT_MODEL if not model else model
+    # Per-machine options from `main.py --tune`, server defaults otherwise
+    return (client or get_client(host)).chat(model=model, messages=memory, stream=True,
+                                             **generation_kwargs(model, host))
+
+
+def drop_stream(response):
+    # Shutting the socket down wakes a read blocked in another thread and tells
+    # Ollama the client is gone, so it stops generating (or prefilling)
+    stream = response.extensions.get('network_stream') if response is not None else None
+    sock = stream.get_extra_info('socket') if stream is not None else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
 
 class Worker_Local(QThread):
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
     partial = pyqtSignal(str)
+    # Emitted before finished: model, ttft (s), decode_rate (tokens/s)
+    stats = pyqtSignal(dict)
 
-    def __init__(self, memory, LLM_API_MODEL, LLM_MODEL_ID):
+    def __init__(self, memory, LLM_API_MODEL, LLM_MODEL_ID, host=None, session=None):
         super().__init__()
         self.memory = memory
         self.LLM_API_MODEL = LLM_API_MODEL
         self.LLM_MODEL_ID = LLM_MODEL_ID
+        self.host = host
+        # Optional ChatSession that keeps the prompt prefix cacheable across turns
+        self.session = session
+        self.cancelled = False
+        self.response = None
+
+    def cancel(self):
+        # Nothing more is emitted, and the HTTP stream is closed so a loser
+        # still in prefill does not keep the server busy
+        self.cancelled = True
+        drop_stream(self.response)
+
+    def on_response(self, response):
+        # httpx hook, called once the headers arrive and before the body streams
+        self.response = response
+        if self.cancelled:
+            drop_stream(response)
 
     def run(self):
+        name_current_thread(f"Worker_Local-{self.LLM_MODEL_ID or DEFAULT_MODEL}")
         try:
             full_response = ""
-            stream = chat(model='gemma3:latest' if self.LLM_MODEL_ID == "" else self.LLM_MODEL_ID,
-                          messages=self.memory, stream=True)
+            start = time.perf_counter()
+            ttft = None
+            last = None
+            # Its own client, so cancelling drops only this worker's connection
+            hooks = {'response': [self.on_response]}
+            client = Client(host=self.host, event_hooks=hooks) if self.host else Client(event_hooks=hooks)
+            if self.session is not None:
+                stream = self.session.stream(self.memory, client)
+            else:
+                stream = stream_chat(self.memory, self.LLM_MODEL_ID, self.host, client)
             for chunk in stream:
+                if self.cancelled:
+                    return
                 content = chunk['message']['content']
                 if content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
                     self.partial.emit(content)
                     full_response += content
-            self.finished.emit(full_response)
+                last = chunk
+            if not self.cancelled:
+                if self.session is not None:
+                    self.session.observe(last)
+                eval_count = (last.get('eval_count') if last else 0) or 0
+                eval_duration = ((last.get('eval_duration') if last else 0) or 0) / 1e9
+                self.stats.emit({
+                    'model': self.LLM_MODEL_ID or DEFAULT_MODEL,
+                    'ttft': ttft if ttft is not None else time.perf_counter() - start,
+                    'decode_rate': eval_count / eval_duration if eval_duration else 0.0,
+                })
+                self.finished.emit(full_response)
         except Exception as e:
-            self.error.emit(str(e))
+            if not self.cancelled:
+                self.error.emit(str(e))
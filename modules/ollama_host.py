@@ -0,0 +1,26 @@
+import os
+import urllib.parse
+
+DEFAULT_PORT = 11434
+
+
+def parse_host(host):
+    # Same rules as the ollama client: http and port 11434 unless given,
+    # and the scheme's own port when only a scheme is given
+    host, port = host or "", DEFAULT_PORT
+    scheme, _, hostport = host.partition("://")
+    if not hostport:
+        scheme, hostport = "http", host
+    elif scheme == "http":
+        port = 80
+    elif scheme == "https":
+        port = 443
+    split = urllib.parse.urlsplit(f"{scheme}://{hostport}")
+    hostname = split.hostname or "127.0.0.1"
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    return f"{scheme}://{hostname}:{split.port or port}{split.path.rstrip('/')}"
+
+
+# Plain requests must reach the same server the ollama client does
+OLLAMA_URL = parse_host(os.getenv("OLLAMA_HOST"))
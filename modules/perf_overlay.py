@@ -0,0 +1,173 @@
+import time
+import weakref
+from collections import defaultdict
+from PyQt5.QtCore import QObject, QEvent, QTimer, Qt, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QLabel
+
+
+class PaintProfiler(QObject):
+    # Qt drops the connection when the receiving overlay is destroyed, so
+    # pruned windows are not kept alive by the profiler
+    snapshot_ready = pyqtSignal(dict)
+
+    def __init__(self, interval_ms=1000, log=False):
+        super().__init__()
+        self.enabled = False
+        self.log = log
+        self.interval_ms = interval_ms
+        self.paint_time = defaultdict(float)
+        self.paint_count = defaultdict(int)
+        self.frames = 0
+        self.frame_time = 0.0
+        self.loop_latency_max = 0.0
+        self.loop_latency_total = 0.0
+        self.loop_latency_samples = 0
+        self.snapshot = {}
+        self.overlays = weakref.WeakSet()
+
+        # A short timer whose lateness is the event-loop latency
+        self._tick_interval = 16
+        self._last_tick = None
+        self._tick_timer = QTimer(self)
+        self._tick_timer.setTimerType(Qt.PreciseTimer)
+        self._tick_timer.timeout.connect(self._on_tick)
+
+        self._report_timer = QTimer(self)
+        self._report_timer.timeout.connect(self._report)
+
+    def start(self):
+        self.enabled = True
+        self._reset()
+        self._last_tick = time.perf_counter()
+        self._tick_timer.start(self._tick_interval)
+        self._report_timer.start(self.interval_ms)
+
+    def stop(self):
+        self.enabled = False
+        self._tick_timer.stop()
+        self._report_timer.stop()
+
+    def _reset(self):
+        self.paint_time.clear()
+        self.paint_count.clear()
+        self.frames = 0
+        self.frame_time = 0.0
+        self.loop_latency_max = 0.0
+        self.loop_latency_total = 0.0
+        self.loop_latency_samples = 0
+        self._window_start = time.perf_counter()
+
+    def _on_tick(self):
+        now = time.perf_counter()
+        lateness = (now - self._last_tick) * 1000 - self._tick_interval
+        self._last_tick = now
+        lateness = max(0.0, lateness)
+        self.loop_latency_max = max(self.loop_latency_max, lateness)
+        self.loop_latency_total += lateness
+        self.loop_latency_samples += 1
+
+    def record(self, receiver, event_type, elapsed):
+        if event_type == QEvent.UpdateRequest:
+            # One UpdateRequest per top-level repaint cycle, i.e. one frame
+            self.frames += 1
+            self.frame_time += elapsed
+        elif event_type == QEvent.Paint:
+            name = receiver.objectName() or type(receiver).__name__
+            if name == "qt_scrollarea_viewport" and receiver.parent() is not None:
+                # Attribute viewport paints to their scroll area
+                parent = receiver.parent()
+                name = parent.objectName() or type(parent).__name__
+            self.paint_time[name] += elapsed
+            self.paint_count[name] += 1
+
+    def _report(self):
+        seconds = max(time.perf_counter() - self._window_start, 1e-6)
+        samples = max(self.loop_latency_samples, 1)
+        self.snapshot = {
+            'fps': self.frames / seconds,
+            'frame_ms': (self.frame_time / self.frames * 1000) if self.frames else 0.0,
+            'loop_latency_avg_ms': self.loop_latency_total / samples,
+            'loop_latency_max_ms': self.loop_latency_max,
+            'paint_ms': {
+                name: (total * 1000, self.paint_count[name])
+                for name, total in sorted(self.paint_time.items(), key=lambda item: -item[1])
+            },
+        }
+        if self.log:
+            print(self.format_snapshot())
+        self.snapshot_ready.emit(self.snapshot)
+        self._reset()
+
+    def format_snapshot(self, limit=6):
+        if not self.snapshot:
+            return "Collecting..."
+        lines = [
+            f"FPS: {self.snapshot['fps']:.1f}  frame: {self.snapshot['frame_ms']:.1f} ms",
+            f"Loop latency: avg {self.snapshot['loop_latency_avg_ms']:.1f} ms, "
+            f"max {self.snapshot['loop_latency_max_ms']:.1f} ms",
+        ]
+        for name, (total_ms, count) in list(self.snapshot['paint_ms'].items())[:limit]:
+            lines.append(f"{name}: {total_ms:.1f} ms / {count} paints")
+        return "\n".join(lines)
+
+
+class ProfilingApplication(QApplication):
+    # Only used when diagnostics are requested, since overriding notify()
+    # routes every event through Python.
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.profiler = PaintProfiler()
+
+    def notify(self, receiver, event):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return super().notify(receiver, event)
+        event_type = event.type()
+        if event_type != QEvent.Paint and event_type != QEvent.UpdateRequest:
+            return super().notify(receiver, event)
+        start = time.perf_counter()
+        result = super().notify(receiver, event)
+        profiler.record(receiver, event_type, time.perf_counter() - start)
+        return result
+
+
+class PerfOverlay(QLabel):
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setObjectName("perf_overlay")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 180); color: #7CFC00; "
+            "font-family: Consolas, monospace; font-size: 9pt; padding: 4px; border: none;"
+        )
+        self.setText(self.profiler.format_snapshot())
+        self.adjustSize()
+        self.hide()
+        profiler.snapshot_ready.connect(self.on_snapshot)
+
+    def set_active(self, active):
+        # The profiler keeps running while any window still shows its overlay
+        if active:
+            self.profiler.overlays.add(self)
+            if not self.profiler.enabled:
+                self.profiler.start()
+            self.move(8, 8)
+            self.show()
+            self.raise_()
+        else:
+            self.profiler.overlays.discard(self)
+            self.hide()
+            if not self.profiler.overlays and not self.profiler.log:
+                self.profiler.stop()
+
+    def on_snapshot(self, snapshot):
+        if self.isVisible():
+            self.setText(self.profiler.format_snapshot())
+            self.adjustSize()
+            self.move(8, 8)
+            self.raise_()
+
+
+def get_profiler():
+    return getattr(QApplication.instance(), 'profiler', None)
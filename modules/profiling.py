@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import defaultdict, Counter
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+def name_current_thread(name):
+    # QThreads show up as "Dummy-N" otherwise; naming them labels the samples
+    threading.current_thread().name = name
+
+
+class SamplingProfiler:
+    # Samples every thread's Python stack and counts folded stacks per thread,
+    # the input format of flamegraph.pl and speedscope.
+    def __init__(self, interval=0.005, trace_frames=15):
+        self.interval = interval
+        self.trace_frames = trace_frames
+        self.samples = defaultdict(Counter)
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.baseline = None
+        self.started_at = None
+
+    def start(self):
+        tracemalloc.start(self.trace_frames)
+        self.baseline = tracemalloc.take_snapshot()
+        self.started_at = time.time()
+        self.running = True
+        self.thread = threading.Thread(target=self._sample_loop, name="SamplingProfiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+
+    def _sample_loop(self):
+        own_id = threading.get_ident()
+        while self.running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    name = names.get(thread_id, f"thread-{thread_id}")
+                    self.samples[name][";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def dump(self, directory=None):
+        directory = directory or os.path.join(PROFILE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            samples = {name: Counter(stacks) for name, stacks in self.samples.items()}
+        for name, stacks in samples.items():
+            safe_name = "".join(char if char.isalnum() or char in "-_" else "_" for char in name)
+            with open(os.path.join(directory, f"cpu_{safe_name}.folded"), "w") as folded_file:
+                for stack, count in stacks.most_common():
+                    folded_file.write(f"{stack} {count}\n")
+        self._write_allocations(os.path.join(directory, "allocations.txt"))
+        print(f"Profile written to {directory}")
+        return directory
+
+    def _write_allocations(self, path, limit=40):
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, "w") as report:
+            report.write(f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n")
+            report.write(f"Session length: {time.time() - self.started_at:.0f} s\n\n")
+            report.write("Top allocations by line\n")
+            for stat in snapshot.statistics('lineno')[:limit]:
+                report.write(f"  {stat}\n")
+            report.write("\nGrowth since start\n")
+            for stat in snapshot.compare_to(self.baseline, 'lineno')[:limit]:
+                report.write(f"  {stat}\n")
+            report.write("\nLargest allocation tracebacks\n")
+            for stat in snapshot.statistics('traceback')[:5]:
+                report.write(f"\n  {stat.count} blocks, {stat.size / 1e3:.1f} KB\n")
+                for line in stat.traceback.format():
+                    report.write(f"    {line}\n")
+
+
+_profiler = None
+
+
+def start_profiling():
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+        _profiler.start()
+    return _profiler
+
+
+def get_sampling_profiler():
+    return _profiler
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import itertools
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.getenv("REPLAY_FIXTURE_DIR", "fixtures")
+RECORDED_PATHS = ("/api/chat", "/api/tags")
+
+_counter = itertools.count()
+
+
+def fixture_summary(path, body):
+    # Enough of the request to pick a matching fixture on replay
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        request = {}
+    return {'path': path, 'model': request.get('model'), 'stream': request.get('stream', True)}
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    # Proxies to the real Ollama and writes chat/tags exchanges with chunk timing
+    def do_GET(self):
+        self._proxy(None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self._proxy(self.rfile.read(length))
+
+    def _proxy(self, body):
+        upstream = self.server.upstream + self.path
+        start = time.perf_counter()
+        response = requests.request(self.command, upstream, data=body, stream=True,
+                                    headers={'Content-Type': self.headers.get('Content-Type', 'application/json')})
+        self.send_response(response.status_code)
+        self.send_header('Content-Type', response.headers.get('Content-Type', 'application/json'))
+        self.end_headers()
+        chunks = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunks.append({'t': round(time.perf_counter() - start, 4), 'data': line.decode()})
+            self.wfile.write(line + b"\n")
+            self.wfile.flush()
+        if self.path in RECORDED_PATHS:
+            fixture = fixture_summary(self.path, body)
+            fixture.update({'status': response.status_code, 'chunks': chunks})
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}_{next(_counter)}_{self.path.strip('/').replace('/', '_')}.json"
+            with open(os.path.join(self.server.fixture_dir, name), "w") as fixture_file:
+                json.dump(fixture, fixture_file)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    # Serves recorded exchanges; timing scaled by speed, with optional faults
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._replay(self.server.pick("/api/tags", None), stream=False)
+        elif self.path == "/api/ps":
+            self._send_json(200, {'models': [{'name': model} for model in self.server.models()]})
+        else:
+            self._send_json(404, {'error': 'not recorded'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = fixture_summary(self.path, self.rfile.read(length))
+        if self.path != "/api/chat":
+            self._send_json(404, {'error': 'not recorded'})
+            return
+        faults = self.server.faults
+        if random.random() < faults['error_rate']:
+            self._send_json(500, {'error': 'injected error'})
+            return
+        self._replay(self.server.pick("/api/chat", request['model']), stream=request['stream'])
+
+    def _replay(self, fixture, stream):
+        if fixture is None:
+            self._send_json(404, {'error': 'no fixture recorded for this request'})
+            return
+        chunks = fixture['chunks']
+        if not stream and len(chunks) > 1:
+            # A streamed recording answered as one message
+            merged = json.loads(chunks[-1]['data'])
+            content = "".join(json.loads(chunk['data']).get('message', {}).get('content', '') for chunk in chunks)
+            merged.setdefault('message', {'role': 'assistant'})['content'] = content
+            chunks = [{'t': chunks[-1]['t'], 'data': json.dumps(merged)}]
+
+        faults = self.server.faults
+        speed = self.server.speed
+        abort_at = len(chunks) // 2 if random.random() < faults['abort_rate'] else None
+        stall_at = random.randrange(len(chunks)) if chunks and random.random() < faults['stall_rate'] else None
+
+        self.send_response(fixture.get('status', 200))
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        start = time.perf_counter()
+        try:
+            for index, chunk in enumerate(chunks):
+                if index == abort_at:
+                    return
+                if index == stall_at:
+                    time.sleep(faults['stall_seconds'])
+                    start += faults['stall_seconds']
+                if speed:
+                    delay = chunk['t'] / speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                self.wfile.write(chunk['data'].encode() + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixture_dir=FIXTURE_DIR, speed=1.0, error_rate=0.0, abort_rate=0.0,
+                 stall_rate=0.0, stall_seconds=5.0):
+        super().__init__(address, ReplayHandler)
+        self.speed = speed
+        self.faults = {'error_rate': error_rate, 'abort_rate': abort_rate,
+                       'stall_rate': stall_rate, 'stall_seconds': stall_seconds}
+        self.fixtures = {}
+        for name in sorted(os.listdir(fixture_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(fixture_dir, name)) as fixture_file:
+                    fixture = json.load(fixture_file)
+                self.fixtures.setdefault(fixture['path'], []).append(fixture)
+        self._cycles = {}
+        self._lock = threading.Lock()
+
+    def models(self):
+        return sorted({fixture['model'] for fixture in self.fixtures.get("/api/chat", []) if fixture['model']})
+
+    def pick(self, path, model):
+        candidates = self.fixtures.get(path, [])
+        if path == "/api/tags" and not candidates:
+            # No recorded tags: advertise the models there are chat fixtures for
+            tags = {'models': [{'name': name, 'size': 0} for name in self.models()]}
+            return {'status': 200, 'chunks': [{'t': 0.0, 'data': json.dumps(tags)}]}
+        matching = [fixture for fixture in candidates if fixture['model'] == model] or candidates
+        if not matching:
+            return None
+        # Rotate through the recordings so repeated requests vary
+        with self._lock:
+            key = (path, model)
+            index = self._cycles.get(key, 0)
+            self._cycles[key] = index + 1
+        return matching[index % len(matching)]
+
+
+def start_replay_server(port=0, **options):
+    server = ReplayServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    from .ollama_host import OLLAMA_URL
+    parser = argparse.ArgumentParser(description="Record or replay Ollama /api/chat and /api/tags exchanges")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="proxy to Ollama and record exchanges")
+    record.add_argument("--port", type=int, default=11500)
+    record.add_argument("--upstream", default=OLLAMA_URL)
+    record.add_argument("--fixtures", default=FIXTURE_DIR)
+
+    serve = subparsers.add_parser("serve", help="replay recorded exchanges")
+    serve.add_argument("--port", type=int, default=11500)
+    serve.add_argument("--fixtures", default=FIXTURE_DIR)
+    serve.add_argument("--speed", type=float, default=1.0, help="timing multiplier, 0 for no delays")
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--abort-rate", type=float, default=0.0)
+    serve.add_argument("--stall-rate", type=float, default=0.0)
+    serve.add_argument("--stall-seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        os.makedirs(args.fixtures, exist_ok=True)
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), RecordingHandler)
+        server.daemon_threads = True
+        server.upstream = args.upstream.rstrip("/")
+        server.fixture_dir = args.fixtures
+        print(f"Recording {server.upstream} into {args.fixtures}; run the app with OLLAMA_HOST=127.0.0.1:{args.port}")
+    else:
+        server = ReplayServer(("127.0.0.1", args.port), args.fixtures, args.speed, args.error_rate,
+                              args.abort_rate, args.stall_rate, args.stall_seconds)
+        print(f"Replaying {args.fixtures} on 127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import os
+import re
+import json
+import random
+import threading
+import requests
+from .tuning import load_profiles
+from .ollama_host import OLLAMA_URL
+
+AUTO_MODEL = "auto"
+STATS_PATH = os.getenv("ROUTING_STATS_PATH", "routing_stats.json")
+
+# Rough answer lengths (tokens) per question type
+ANSWER_TOKENS = {'quick': 60, 'normal': 200, 'deep': 500}
+REFERENCE_MEGAPIXELS = 1.0
+# Weight of a new measurement in the moving averages
+SMOOTHING = 0.3
+# Share of questions sent to a model without measurements, so it gets some
+EXPLORE_RATE = float(os.getenv("ROUTING_EXPLORE_RATE", "0.1"))
+
+DEEP_WORDS = re.compile(
+    r"\b(code|review|bug|debug|refactor|explain|why|analy[sz]e|compare|stack ?trace|error|optimi[sz]e|step)", re.I)
+QUICK_WORDS = re.compile(r"^\s*(what|which|where|is|does|read)\b.{0,60}\b(say|says|text|button|label|called|named|read)\b", re.I)
+POOR_ANSWER = re.compile(r"(i can('|no)t see|unable to (see|view|read)|no image|i'm not sure|i am not sure)", re.I)
+
+
+def classify_question(text):
+    if QUICK_WORDS.search(text) and len(text) < 100:
+        return 'quick'
+    if DEEP_WORDS.search(text) or len(text) > 200:
+        return 'deep'
+    return 'normal'
+
+
+class ModelRouter:
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = self._load()
+        self.sizes = {}
+        self.refresh_sizes_in_background()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as stats_file:
+                stats = json.load(stats_file)
+        except (OSError, ValueError):
+            stats = {}
+        # Seed models measured by the tuner but never used yet
+        for model, profile in load_profiles().items():
+            if model not in stats and profile.get('decode_rate'):
+                stats[model] = {'ttft': profile['ttft'], 'decode_rate': profile['decode_rate'],
+                                'megapixels': REFERENCE_MEGAPIXELS, 'samples': 0}
+        return stats
+
+    def _save(self):
+        with open(self.path, "w") as stats_file:
+            json.dump(self.stats, stats_file, indent=2)
+
+    def refresh_sizes(self):
+        try:
+            response = requests.get(f'{OLLAMA_URL}/api/tags', timeout=5)
+            self.sizes = {model['name']: model.get('size', 0) for model in response.json().get('models', [])}
+        except Exception:
+            pass
+        return self.sizes
+
+    def refresh_sizes_in_background(self):
+        # Sizes only order the candidates, so routing never waits for /api/tags
+        threading.Thread(target=self.refresh_sizes, daemon=True).start()
+
+    def record(self, model, ttft, decode_rate, megapixels, follow_up=False):
+        # Follow-ups are mostly served from the prompt cache, so their time to
+        # first token is averaged separately from first turns
+        if not decode_rate:
+            return
+        with self.lock:
+            current = self.stats.get(model)
+            if current is None:
+                if follow_up:
+                    return
+                self.stats[model] = {'ttft': ttft, 'decode_rate': decode_rate,
+                                     'megapixels': megapixels or REFERENCE_MEGAPIXELS, 'samples': 1}
+            else:
+                if follow_up:
+                    measured = (('follow_up_ttft', ttft), ('decode_rate', decode_rate))
+                else:
+                    measured = (('ttft', ttft), ('decode_rate', decode_rate), ('megapixels', megapixels))
+                for key, value in measured:
+                    if value:
+                        previous = current.get(key, value)
+                        current[key] = (1 - SMOOTHING) * previous + SMOOTHING * value
+                current['samples'] = current.get('samples', 0) + 1
+            self._save()
+
+    def predict(self, model, kind, megapixels, follow_up=False):
+        stats = self.stats.get(model)
+        if stats is None:
+            return None
+        ttft = stats.get('follow_up_ttft', stats['ttft']) if follow_up else stats['ttft']
+        if megapixels and not follow_up:
+            # Prefill grows with the image; damped because vision encoders resize
+            ratio = megapixels / max(stats.get('megapixels') or REFERENCE_MEGAPIXELS, 0.01)
+            ttft *= max(0.5, 1 + 0.5 * (ratio - 1))
+        return ttft + ANSWER_TOKENS[kind] / stats['decode_rate']
+
+    def by_size(self, models):
+        return sorted(models, key=lambda model: self.sizes.get(model, 0))
+
+    def route(self, text, models, megapixels=None, target=8.0, follow_up=False):
+        # Largest measured model that fits the latency target, else the fastest.
+        # Quick questions just take the fastest model.
+        kind = classify_question(text)
+        if not models:
+            return None, kind, None
+        predictions = {model: self.predict(model, kind, megapixels, follow_up) for model in models}
+        measured = [model for model in models if predictions[model] is not None]
+        unmeasured = [model for model in models if predictions[model] is None]
+        if unmeasured and (not measured or random.random() < EXPLORE_RATE):
+            # The smallest unmeasured model is the cheapest to learn about
+            return self.by_size(unmeasured)[0], kind, None
+        fastest = min(measured, key=lambda model: predictions[model])
+        if kind == 'quick':
+            return fastest, kind, predictions[fastest]
+        fitting = [model for model in measured if predictions[model] <= target]
+        choice = self.by_size(fitting)[-1] if fitting else fastest
+        return choice, kind, predictions[choice]
+
+    def step_up(self, model, models):
+        ordered = self.by_size(models)
+        if model not in ordered:
+            return None
+        position = ordered.index(model)
+        return ordered[position + 1] if position + 1 < len(ordered) else None
+
+    def is_poor(self, kind, response):
+        stripped = response.strip()
+        if not stripped or POOR_ANSWER.search(stripped[:300]):
+            return True
+        return kind == 'deep' and len(stripped) < 80
+
+
+_router = None
+
+
+def get_router():
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
@@ -1,6 +1,7 @@
 from PyQt5.QtCore import QThread, pyqtSignal
 import os
 import time
+from .profiling import name_current_thread
 
 class ScreenshotWatcher(QThread):
     screenshot_detected = pyqtSignal(str)
@@ -17,6 +18,7 @@ class ScreenshotWatcher(QThread):
             return os.path.join(os.path.expanduser("~"), "OneDrive", "Pictures", "Screenshots")
 
     def run(self):
+        name_current_thread("ScreenshotWatcher")
         while True:
             self.check_for_new_screenshots()
             self.msleep(1000)  # Check every second
@@ -0,0 +1,67 @@
+import os
+import base64
+from .tuning import generation_kwargs
+from .local_generate import get_client
+
+SESSION_KEEP_ALIVE = os.getenv("SESSION_KEEP_ALIVE", "30m")
+
+
+class ChatSession:
+    # Pins what decides whether Ollama can reuse a conversation's cached
+    # prompt: options stay fixed for the session, since changing a load-time
+    # option reloads the model and drops the cache, and keep_alive keeps the
+    # model (and so the cache) loaded between turns. The messages were already
+    # sent identically on every turn; images are just base64-encoded once
+    # instead of per turn. When the cache was evicted anyway, Ollama prefills
+    # the full history again.
+    def __init__(self, model, host=None):
+        self.model = model
+        self.host = host
+        self.kwargs = generation_kwargs(model, host)
+        self.kwargs.setdefault('keep_alive', SESSION_KEEP_ALIVE)
+        self.images = {}
+        self.context_tokens = 0
+        self.turns = 0
+        self.last_reused = None
+
+    def matches(self, model, host=None):
+        return self.model == model and self.host == host
+
+    def encode_image(self, image):
+        # Paths are read and encoded once; base64 strings pass through
+        if image not in self.images:
+            if os.path.isfile(image):
+                with open(image, "rb") as image_file:
+                    self.images[image] = base64.b64encode(image_file.read()).decode("utf-8")
+            else:
+                self.images[image] = image
+        return self.images[image]
+
+    def messages(self, memory):
+        prepared = []
+        for message in memory:
+            if message.get('images'):
+                message = dict(message, images=[self.encode_image(image) for image in message['images']])
+            prepared.append(message)
+        return prepared
+
+    def stream(self, memory, client=None):
+        return (client or get_client(self.host)).chat(model=self.model, messages=self.messages(memory),
+                                                      stream=True, **self.kwargs)
+
+    def observe(self, final_chunk):
+        # prompt_eval_count only counts tokens that were not served from the cache
+        prompt_eval_count = (final_chunk.get('prompt_eval_count') if final_chunk else 0) or 0
+        eval_count = (final_chunk.get('eval_count') if final_chunk else 0) or 0
+        if self.turns:
+            self.last_reused = prompt_eval_count < self.context_tokens
+            state = "reused" if self.last_reused else "evicted, full prefill"
+            print(f"Session prefill {state}: {prompt_eval_count} prompt tokens processed "
+                  f"(previous context {self.context_tokens})")
+            if self.last_reused:
+                self.context_tokens += prompt_eval_count + eval_count
+            else:
+                self.context_tokens = prompt_eval_count + eval_count
+        else:
+            self.context_tokens = prompt_eval_count + eval_count
+        self.turns += 1
@@ -0,0 +1,166 @@
+import os
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import QThread, pyqtSignal, QBuffer, QByteArray, QIODevice, QRect
+from PyQt5.QtGui import QImage
+from .local_generate import get_client, stream_chat, DEFAULT_MODEL, SYSTEM_MESSAGE
+from .tuning import generation_kwargs
+from .profiling import name_current_thread
+
+TILED = "tiled"
+TILE_SIZE = int(os.getenv("TILE_SIZE", "1024"))
+TILE_OVERLAP = int(os.getenv("TILE_OVERLAP", "128"))
+TILE_CONCURRENCY = int(os.getenv("TILE_CONCURRENCY", "2"))
+# Below this many megapixels the whole image is sent as usual
+TILE_MIN_MEGAPIXELS = float(os.getenv("TILE_MIN_MEGAPIXELS", "3"))
+MAX_CACHED_TILES = 256
+
+# The tile prompt does not depend on the question, so findings can be reused
+# for every follow-up on the same screenshot.
+TILE_PROMPT = (
+    "This image is one tile of a larger screenshot, covering pixels x={x}..{x2}, y={y}..{y2} "
+    "of a {width}x{height} capture. Transcribe all readable text exactly and describe the UI "
+    "elements, code, charts or errors in this tile. Say 'empty' if there is nothing of note."
+)
+REDUCE_PROMPT = (
+    "A large screenshot ({width}x{height}) was analyzed in overlapping tiles. "
+    "Findings per tile, in reading order:\n\n{findings}\n\n"
+    "Using these findings, answer the question. Text in overlapping areas may appear twice.\n\n"
+    "Question: {question}"
+)
+
+_tile_cache = OrderedDict()
+_tile_cache_lock = threading.Lock()
+
+
+def tile_rects(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    step = max(1, tile_size - overlap)
+    xs = list(range(0, max(width - overlap, 1), step))
+    ys = list(range(0, max(height - overlap, 1), step))
+    rects = []
+    for y in ys:
+        for x in xs:
+            rects.append(QRect(x, y, min(tile_size, width - x), min(tile_size, height - y)))
+    return rects
+
+
+def needs_tiling(width, height):
+    return width * height / 1e6 >= TILE_MIN_MEGAPIXELS
+
+
+def encode_png(image):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return base64.b64encode(bytes(data)).decode("utf-8")
+
+
+def cache_get(key):
+    with _tile_cache_lock:
+        if key in _tile_cache:
+            _tile_cache.move_to_end(key)
+            return _tile_cache[key]
+    return None
+
+
+def cache_put(key, value):
+    with _tile_cache_lock:
+        _tile_cache[key] = value
+        _tile_cache.move_to_end(key)
+        while len(_tile_cache) > MAX_CACHED_TILES:
+            _tile_cache.popitem(last=False)
+
+
+class TiledWorker(QThread):
+    # Same finished/error/partial contract as Worker_Local, plus tile progress
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    partial = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, image_path, question, history, model, hosts=None, concurrency=TILE_CONCURRENCY):
+        super().__init__()
+        self.image_path = image_path
+        self.question = question
+        self.history = history
+        self.model = model or DEFAULT_MODEL
+        self.hosts = hosts or [None]
+        self.concurrency = max(1, concurrency)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def analyze_tile(self, image, rect, digest, host):
+        key = (digest, rect.x(), rect.y(), rect.width(), rect.height(), self.model)
+        cached = cache_get(key)
+        if cached is not None:
+            return cached
+        prompt = TILE_PROMPT.format(x=rect.x(), x2=rect.right(), y=rect.y(), y2=rect.bottom(),
+                                    width=image.width(), height=image.height())
+        response = get_client(host).chat(
+            model=self.model,
+            messages=[{'role': 'user', 'content': prompt, 'images': [encode_png(image.copy(rect))]}],
+            **generation_kwargs(self.model, host),
+        )
+        finding = response['message']['content'].strip()
+        cache_put(key, finding)
+        return finding
+
+    def run(self):
+        name_current_thread("TiledWorker")
+        try:
+            with open(self.image_path, "rb") as image_file:
+                data = image_file.read()
+            digest = hashlib.sha1(data).hexdigest()
+            image = QImage.fromData(data)
+            if image.isNull():
+                self.error.emit(f"Could not read image {self.image_path}")
+                return
+
+            rects = tile_rects(image.width(), image.height())
+            findings = [None] * len(rects)
+            done = 0
+            self.progress.emit(done, len(rects))
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="TileWorker") as pool:
+                # Tiles are spread round-robin over the backends
+                futures = {
+                    pool.submit(self.analyze_tile, image, rect, digest, self.hosts[index % len(self.hosts)]): index
+                    for index, rect in enumerate(rects)
+                }
+                for future in as_completed(futures):
+                    if self.cancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        return
+                    findings[futures[future]] = future.result()
+                    done += 1
+                    self.progress.emit(done, len(rects))
+
+            findings_text = "\n\n".join(
+                f"[Tile {index + 1} at x={rect.x()}, y={rect.y()}, {rect.width()}x{rect.height()}]\n{finding}"
+                for index, (rect, finding) in enumerate(zip(rects, findings))
+                if finding and finding.lower().strip(" .") != "empty"
+            )
+            # One reduce request, streamed like a normal answer
+            messages = [{'role': 'system', 'content': SYSTEM_MESSAGE}]
+            messages += [{'role': message['role'], 'content': message['content']}
+                         for message in self.history if message['role'] != 'system']
+            messages.append({'role': 'user', 'content': REDUCE_PROMPT.format(
+                width=image.width(), height=image.height(), findings=findings_text, question=self.question)})
+            full_response = ""
+            for chunk in stream_chat(messages, self.model, self.hosts[0]):
+                if self.cancelled:
+                    return
+                content = chunk['message']['content']
+                if content:
+                    self.partial.emit(content)
+                    full_response += content
+            self.finished.emit(full_response)
+        except Exception as e:
+            if not self.cancelled:
+                self.error.emit(str(e))
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import zlib
+import uuid
+import struct
+import argparse
+import itertools
+import requests
+from ollama import chat
+from .ollama_host import OLLAMA_URL
+
+PROFILE_PATH = os.getenv("TUNING_PROFILE_PATH", "tuning_profiles.json")
+
+DEFAULT_PROMPTS = [
+    "What does this screenshot show?",
+    "List every piece of text visible in this image.",
+]
+
+# Answers are cut at num_predict during the benchmark; the score assumes a
+# typical answer of this many tokens.
+TYPICAL_ANSWER_TOKENS = 200
+# Not tuned: a smaller context is always faster on one turn, but would
+# truncate a conversation with an image and a few follow-ups
+NUM_CTX = int(os.getenv("TUNING_NUM_CTX", "8192"))
+
+# path -> (mtime, profiles); re-read only when --tune rewrote the file
+_profile_cache = {}
+
+
+def load_profiles(path=PROFILE_PATH):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    cached = _profile_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        with open(path, "r") as profile_file:
+            profiles = json.load(profile_file)
+    except (OSError, ValueError):
+        return {}
+    _profile_cache[path] = (mtime, profiles)
+    return profiles
+
+
+def save_profiles(profiles, path=PROFILE_PATH):
+    with open(path, "w") as profile_file:
+        json.dump(profiles, profile_file, indent=2)
+    _profile_cache.pop(path, None)
+
+
+def get_profile(model, path=PROFILE_PATH):
+    return load_profiles(path).get(model)
+
+
+def generation_kwargs(model, host=None, path=PROFILE_PATH):
+    # Keyword arguments for ollama.chat from the saved profile, empty when untuned.
+    # Profiles describe this machine, so other hosts keep their server defaults.
+    profile = get_profile(model, path) if not host else None
+    if not profile:
+        return {}
+    kwargs = {'options': dict(profile.get('options', {}))}
+    if profile.get('keep_alive'):
+        kwargs['keep_alive'] = profile['keep_alive']
+    return kwargs
+
+
+def installed_models():
+    response = requests.get(f'{OLLAMA_URL}/api/tags', timeout=10)
+    response.raise_for_status()
+    return [model['name'] for model in response.json().get('models', [])]
+
+
+def synthetic_screenshot(path, width=1280, height=720):
+    # Deterministic "window" image so every machine benchmarks the same input
+    rows = []
+    for y in range(height):
+        row = bytearray([0])
+        for x in range(width):
+            if y < 40:
+                pixel = (45, 92, 138)
+            elif 60 <= y < 680 and 40 <= x < 300:
+                pixel = (51, 51, 51) if (y // 30) % 2 else (35, 35, 35)
+            elif 80 <= y < 660 and 340 <= x < 1240 and (y // 12) % 3 == 0 and (x // 8) % 5:
+                pixel = (224, 224, 224)
+            else:
+                pixel = (30, 30, 30)
+            row.extend(pixel)
+        rows.append(bytes(row))
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    png = b"\x89PNG\r\n\x1a\n"
+    png += chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+    png += chunk(b"IEND", b"")
+    with open(path, "wb") as image_file:
+        image_file.write(png)
+    return path
+
+
+def candidate_options(num_predict):
+    cores = os.cpu_count() or 4
+    threads = sorted({max(1, cores // 2), cores})
+    for num_thread, num_batch in itertools.product(threads, [128, 512]):
+        yield {
+            'num_ctx': NUM_CTX,
+            'num_thread': num_thread,
+            'num_batch': num_batch,
+            'num_predict': num_predict,
+        }
+
+
+def benchmark_run(model, options, image_path, prompt, keep_alive):
+    # A unique first message so no run is served from another run's prompt cache
+    messages = [
+        {'role': 'system', 'content': f"Benchmark run {uuid.uuid4().hex}."},
+        {'role': 'user', 'content': prompt, 'images': [image_path]},
+    ]
+    start = time.perf_counter()
+    first_token = None
+    last = None
+    for chunk in chat(model=model, messages=messages, stream=True, options=options, keep_alive=keep_alive):
+        if first_token is None and chunk['message']['content']:
+            first_token = time.perf_counter() - start
+        last = chunk
+    total = time.perf_counter() - start
+    eval_count = (last or {}).get('eval_count') or 0
+    eval_duration = ((last or {}).get('eval_duration') or 0) / 1e9
+    return {
+        'ttft': first_token if first_token is not None else total,
+        'decode_rate': eval_count / eval_duration if eval_duration else 0.0,
+    }
+
+
+def score(result):
+    # Expected seconds for a typical answer; lower is better
+    if not result['decode_rate']:
+        return float('inf')
+    return result['ttft'] + TYPICAL_ANSWER_TOKENS / result['decode_rate']
+
+
+def tune_model(model, images, prompts, num_predict=64, keep_alive="30m", log=print):
+    best = None
+    for options in candidate_options(num_predict):
+        # num_thread and num_batch are load-time options, so each
+        # candidate reloads the model; an untimed run with the exact options
+        # keeps that reload out of the measurement
+        benchmark_run(model, options, images[0], prompts[0], keep_alive)
+        runs = [benchmark_run(model, options, image, prompt, keep_alive)
+                for image in images for prompt in prompts]
+        result = {
+            'ttft': sum(run['ttft'] for run in runs) / len(runs),
+            'decode_rate': sum(run['decode_rate'] for run in runs) / len(runs),
+        }
+        log(f"  {options} -> ttft {result['ttft']:.2f}s, {result['decode_rate']:.1f} tok/s")
+        if best is None or score(result) < score(best['result']):
+            best = {'options': options, 'result': result}
+
+    tuned_options = dict(best['options'])
+    # num_predict only bounds the benchmark; answers keep the server default
+    tuned_options.pop('num_predict', None)
+    return {
+        'options': tuned_options,
+        'keep_alive': keep_alive,
+        'ttft': best['result']['ttft'],
+        'decode_rate': best['result']['decode_rate'],
+        'tuned_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Ollama generation options on this machine")
+    parser.add_argument("--models", nargs="*", help="Models to tune (default: all installed)")
+    parser.add_argument("--images", nargs="*", help="Screenshots to benchmark with (default: a synthetic one)")
+    parser.add_argument("--num-predict", type=int, default=64)
+    parser.add_argument("--keep-alive", default="30m")
+    parser.add_argument("--profile-path", default=PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    models = args.models or installed_models()
+    images = args.images
+    if not images:
+        images = [synthetic_screenshot(os.path.join(os.path.dirname(os.path.abspath(args.profile_path)),
+                                                    "tuning_benchmark.png"))]
+
+    profiles = dict(load_profiles(args.profile_path))
+    for model in models:
+        print(f"Tuning {model}")
+        try:
+            profiles[model] = tune_model(model, images, DEFAULT_PROMPTS, args.num_predict, args.keep_alive)
+        except Exception as e:
+            print(f"  skipped: {e}")
+            continue
+        # Save after each model so an interrupted run keeps its progress
+        save_profiles(profiles, args.profile_path)
+        print(f"  best: {profiles[model]['options']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
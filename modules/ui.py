@@ -1,6 +1,6 @@
 import os
+import uuid
 import base64
-import markdown
 from PyQt5.QtWidgets import (
     QMainWindow, 
     QMessageBox, 
@@ -13,22 +13,31 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QComboBox,
     QPushButton,
-    QSizePolicy
+    QSizePolicy,
+    QToolButton,
+    QDoubleSpinBox
 )
 from PyQt5 import QtWidgets
-from PyQt5.QtGui import QPixmap, QPainter, QGuiApplication, QFont, QColor
+from PyQt5.QtGui import QPixmap, QPainter, QGuiApplication, QFont, QColor, QImageReader
 from PyQt5.QtCore import Qt, QSize, QPoint
 from .interface import Ui_MainWindow  # Import the generated UI class
-from .local_generate import Worker_Local
+from .local_generate import Worker_Local, SYSTEM_MESSAGE, DEFAULT_MODEL
+from .session import ChatSession
+from .ollama_host import OLLAMA_URL
+from .archive import get_archive
+from .perf_overlay import PerfOverlay, get_profiler
+from .profiling import get_sampling_profiler
+from .conversation_view import ConversationView, USER_ROLE, AI_ROLE
+from .routing import get_router, AUTO_MODEL
+from .tiling import TiledWorker, TILED, needs_tiling, encode_png
+from .capture_diff import same_size, DIFF_FOLLOW_UP, FOLLOW_UP_PROMPT
+from .fanout import FanoutController, FanoutWindow, target_name, COMPARE, HEDGE_FIRST_TOKEN, HEDGE_FIRST_FINISH
 import asyncio
 import dotenv
 import json
 import requests
 import pyperclip
 
-USER_ROLE = "user"
-AI_ROLE = "assistant"
-
 class ImageLabel(QtWidgets.QLabel):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -140,6 +149,12 @@ class ImageLabel(QtWidgets.QLabel):
         menu.addAction(reset_zoom)
         menu.addAction(upload_image)
 
+        if get_sampling_profiler() is not None:
+            write_profile = QAction("Write Profile Snapshot", self)
+            write_profile.triggered.connect(lambda: get_sampling_profiler().dump())
+            menu.addSeparator()
+            menu.addAction(write_profile)
+
         # Show menu at cursor position
         menu.exec_(event.globalPos())
 
@@ -174,6 +189,7 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         super().__init__()
         self.image_path = image_path
         self.memory = []
+        self.session_id = uuid.uuid4().hex
         self.load_config()
         
         # Set app-wide stylesheet for modern look
@@ -222,15 +238,21 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         models = self.get_ollama_models()
         
         # Set up models in combo box
+        self.installed_models = models
         if models:
             self.ollama_model_combo.clear()
-            self.ollama_model_combo.addItems(models)
-            if self.LLM_MODEL_ID and self.LLM_MODEL_ID in models:
+            self.ollama_model_combo.addItems([AUTO_MODEL] + models)
+            if self.LLM_MODEL_ID and (self.LLM_MODEL_ID in models or self.LLM_MODEL_ID == AUTO_MODEL):
                 self.ollama_model_combo.setCurrentText(self.LLM_MODEL_ID)
             else:
                 self.ollama_model_combo.setCurrentText(models[0])
+            self.set_fanout_models(models)
         
-        self.ollama_system_message = 'You are an AI assistant analyzing images. Provide detailed and accurate descriptions of the image contents.'
+        self.fanout_controllers = []
+        self.fanout_window = None
+        self._routed = None
+        self.chat_session = None
+        self.ollama_system_message = SYSTEM_MESSAGE
 
     def setupSimpleLayout(self):
         # Create new central widget with layout
@@ -262,21 +284,56 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         self.refresh_models.setFont(buttonFont)
         self.refresh_models.setFixedHeight(40)  
         
+        # Fan-out: send to several models/hosts at once
+        self.fanout_mode_combo = QComboBox()
+        self.fanout_mode_combo.setFont(comboFont)
+        self.fanout_mode_combo.setFixedHeight(30)
+        self.fanout_mode_combo.addItem("Single", None)
+        self.fanout_mode_combo.addItem("Compare", COMPARE)
+        self.fanout_mode_combo.addItem("Hedged: first token", HEDGE_FIRST_TOKEN)
+        self.fanout_mode_combo.addItem("Hedged: first finish", HEDGE_FIRST_FINISH)
+        self.fanout_mode_combo.addItem("Tiled (large images)", TILED)
+
+        self.fanout_models_button = QToolButton()
+        self.fanout_models_button.setText("Models")
+        self.fanout_models_button.setFixedHeight(30)
+        self.fanout_models_button.setPopupMode(QToolButton.InstantPopup)
+        self.fanout_models_menu = QMenu(self.fanout_models_button)
+        self.fanout_models_button.setMenu(self.fanout_models_menu)
+
+        # Latency target for the "auto" model
+        self.latency_target_spin = QDoubleSpinBox()
+        self.latency_target_spin.setFont(comboFont)
+        self.latency_target_spin.setFixedHeight(30)
+        self.latency_target_spin.setRange(1.0, 120.0)
+        self.latency_target_spin.setSingleStep(1.0)
+        self.latency_target_spin.setSuffix(" s")
+        self.latency_target_spin.setToolTip("Latency target for automatic model routing")
+        self.latency_target_spin.setValue(self.ROUTING_LATENCY_TARGET)
+        self.latency_target_spin.setVisible(False)
+        self.latency_target_spin.valueChanged.connect(self.save_latency_target)
+        self.ollama_model_combo.currentTextChanged.connect(
+            lambda model: self.latency_target_spin.setVisible(model == AUTO_MODEL))
+
         modelLayout.addWidget(modelLabel)
         modelLayout.addWidget(self.ollama_model_combo, 1)
+        modelLayout.addWidget(self.latency_target_spin)
+        modelLayout.addWidget(self.fanout_mode_combo)
+        modelLayout.addWidget(self.fanout_models_button)
         modelLayout.addWidget(self.refresh_models)
         mainLayout.addLayout(modelLayout)
         
         # Replace the image label with our custom ImageLabel (now below model selection)
         self.image_label = ImageLabel()
+        self.image_label.setObjectName("image_label")
         self.image_label.setMinimumHeight(600)  # Further reduced height
         self.image_label.setMaximumHeight(600)  # Further reduced height
         self.image_label.setStyleSheet("border-radius: 8px; background-color: #232323;")
         mainLayout.addWidget(self.image_label)
         
         # Add conversation widget
-        self.conversation = QtWidgets.QTextEdit()
-        self.conversation.setReadOnly(True)
+        self.conversation = ConversationView()
+        self.conversation.setObjectName("conversation")
         self.conversation.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         conversationFont = self.conversation.font()
         conversationFont.setPointSize(conversationFont.pointSize() + 2)
@@ -333,11 +390,15 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         
         # Add drop shadow effect to main components
         self.add_shadow_effects()
+        self.low_overhead_render = False
+        if self.RENDER_PROFILE == "low":
+            self.set_render_profile(True)
         
         # Connect signals
         self.setup_ui()
         # Add quit shortcut
         self.setShortcut()
+        self.setup_diagnostics()
 
     def add_shadow_effects(self):
         # Add subtle shadow effect to components
@@ -349,15 +410,79 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
             effect.setOffset(0, 2)
             widget.setGraphicsEffect(effect)
 
+    def set_render_profile(self, low_overhead):
+        # The low-overhead profile drops the drop shadows (each one forces an
+        # offscreen render per update) and the stacked per-widget stylesheets.
+        styled = [self.image_label, self.conversation, self.entry, self.reset_memory]
+        if low_overhead == self.low_overhead_render:
+            return
+        if low_overhead:
+            self._full_stylesheets = {widget: widget.styleSheet() for widget in styled}
+            self._full_window_stylesheet = self.styleSheet()
+            for widget in [self.image_label, self.conversation, self.entry,
+                           self.send_button, self.reset_memory, self.ollama_model_combo]:
+                widget.setGraphicsEffect(None)
+            for widget in styled:
+                widget.setStyleSheet("")
+            self.setStyleSheet("""
+                QWidget { background-color: #1e1e1e; color: #e0e0e0; }
+                QListView, QLineEdit, QComboBox { background-color: #2d2d2d; border: 1px solid #404040; }
+                QPushButton { background-color: #0056b3; color: #ffffff; border: none; padding: 6px 12px; }
+            """)
+        else:
+            self.setStyleSheet(self._full_window_stylesheet)
+            for widget, sheet in self._full_stylesheets.items():
+                widget.setStyleSheet(sheet)
+            self.add_shadow_effects()
+        self.low_overhead_render = low_overhead
+
+    def toggle_render_profile(self):
+        self.set_render_profile(not self.low_overhead_render)
+        self.RENDER_PROFILE = "low" if self.low_overhead_render else "full"
+        # Updated in place so the other .env settings survive
+        dotenv.set_key(".env", "RENDER_PROFILE", self.RENDER_PROFILE, quote_mode="never")
+        print(f"Render profile: {self.RENDER_PROFILE}")
+
+    def setup_diagnostics(self):
+        render_action = QAction("Toggle Low-Overhead Rendering", self)
+        render_action.setShortcut("Ctrl+Shift+L")
+        render_action.triggered.connect(self.toggle_render_profile)
+        self.addAction(render_action)
+
+        # CPU/memory reports on demand (main.py --profile)
+        if get_sampling_profiler() is not None:
+            profile_action = QAction("Write Profile Snapshot", self)
+            profile_action.setShortcut("Ctrl+Shift+P")
+            profile_action.triggered.connect(lambda: get_sampling_profiler().dump())
+            self.addAction(profile_action)
+
+        # Paint timing needs the profiling QApplication (main.py --diagnostics)
+        self.perf_overlay = None
+        profiler = get_profiler()
+        if profiler is None:
+            return
+        self.perf_overlay = PerfOverlay(profiler, self)
+        overlay_action = QAction("Toggle Performance Overlay", self)
+        overlay_action.setShortcut("Ctrl+Shift+D")
+        overlay_action.triggered.connect(self.toggle_perf_overlay)
+        self.addAction(overlay_action)
+
+    def toggle_perf_overlay(self):
+        self.perf_overlay.set_active(not self.perf_overlay.isVisible())
+
     def load_config(self):
         dotenv.load_dotenv(override=True)
         self.LLM_API_MODEL = os.getenv("LLM_API_KEY")
         self.LLM_MODEL_ID = os.getenv("LLM_MODEL_ID")
         self.OLLAMA = os.getenv("OLLAMA")        
+        self.RENDER_PROFILE = os.getenv("RENDER_PROFILE", "full")
+        self.ROUTING_LATENCY_TARGET = float(os.getenv("ROUTING_LATENCY_TARGET", "8"))
+        self.ROUTING_STEP_UP = os.getenv("ROUTING_STEP_UP", "1") == "1"
+        # Extra Ollama hosts for fan-out, e.g. "http://box1:11434,http://box2:11434"
+        self.OLLAMA_HOSTS = [host.strip() for host in os.getenv("OLLAMA_HOSTS", "").split(",") if host.strip()]
 
     def setup_ui(self):
         self.display_image()
-        self.conversation.setReadOnly(True)
        # self.conversation.append("<span style='color:#a0a0a0; font-size:14pt;'>Ask me anything about this screenshot!</span><br>")
         self.send_button.clicked.connect(self.send_text)
         self.reset_memory.clicked.connect(self.reset)
@@ -369,16 +494,22 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
     def save_config(self):
         LLM_MODEL_ID = self.ollama_model_combo.currentText()
         
-        with open(".env", "w") as env_file:
-            env_file.write(f"LLM_API_KEY={self.LLM_API_MODEL or ''}\n")
-            env_file.write(f"LLM_MODEL_ID={LLM_MODEL_ID}\n")
-            env_file.write("OLLAMA=1\n")
+        # Update keys in place so other settings in .env survive
+        dotenv.set_key(".env", "LLM_API_KEY", self.LLM_API_MODEL or '', quote_mode="never")
+        dotenv.set_key(".env", "LLM_MODEL_ID", LLM_MODEL_ID, quote_mode="never")
+        dotenv.set_key(".env", "OLLAMA", "1", quote_mode="never")
         
         self.load_config()
         self.show_message("Configuration saved successfully!")
         
+    def save_latency_target(self, value):
+        dotenv.set_key(".env", "ROUTING_LATENCY_TARGET", f"{value:g}", quote_mode="never")
+        self.ROUTING_LATENCY_TARGET = value
+
     def reset(self):
         self.memory = []
+        self.session_id = uuid.uuid4().hex
+        self.chat_session = None
         self.conversation.clear()
         self.entry.setFocus()
 
@@ -433,6 +564,7 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
                 self.show_error_message("No image found")
                 self.loading_label.setText("")
                 return
+            get_archive().record(self.image_path, self.session_id)
         else:
             self.memory.append({'role': USER_ROLE, 'content': text})
         
@@ -444,54 +576,228 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
             self.LLM_MODEL_ID = current_model
             self.save_config()
             
+        # Routing state from an earlier turn must not trigger a step-up now
+        self._routed = None
+        mode = self.fanout_mode_combo.currentData()
+        if mode and mode != TILED:
+            self.start_fanout(text, mode)
+            return
+
+        model = self.ollama_model_combo.currentText()
+        if model == AUTO_MODEL:
+            model = self.route_question(text)
+
+        if mode == TILED and self.image_needs_tiling():
+            self.start_tiled_worker(text, model)
+            return
+
         print("Using Ollama")
-        generator = Worker_Local(self.memory, self.LLM_API_MODEL, self.ollama_model_combo.currentText())
+        self.start_worker(model)
+
+    def can_follow_up(self, new_path):
+        # Cheap checks only; the pixel diff runs on a FollowUpMatcher
+        return (DIFF_FOLLOW_UP and bool(self.memory) and self.isVisible() and not self.is_busy()
+                and same_size(self.image_path, new_path))
+
+    def follow_up(self, new_path, diffed_path, region, new_image):
+        # Sends only the changed area of a recapture of this window's region.
+        # The window may have moved on while the diff ran.
+        if self.image_path != diffed_path or not self.can_follow_up(new_path):
+            return False
+
+        self.image_path = new_path
+        get_archive().record(new_path, self.session_id)
+        self.image_label.set_image_path(new_path)
+        self.image_label.setPixmap(QPixmap.fromImage(new_image))
+        self.update_conversation(
+            f"New capture: changed area {region.width()}x{region.height()} at ({region.x()}, {region.y()})",
+            USER_ROLE)
+        prompt = FOLLOW_UP_PROMPT.format(x=region.x(), x2=region.right(), y=region.y(), y2=region.bottom(),
+                                         width=new_image.width(), height=new_image.height())
+        self.memory.append({'role': USER_ROLE, 'content': prompt, 'images': [encode_png(new_image.copy(region))]})
+        self.loading_label.setText("⏳")
+        self.loading_label.setStyleSheet("font-size: 18px; color: #6a9eda;")
+
+        model = self.ollama_model_combo.currentText()
+        self._routed = None
+        if model == AUTO_MODEL:
+            model = self.route_question(prompt)
+        print(f"Follow-up capture, sending {region.width()}x{region.height()} crop")
+        self.start_worker(model)
+        self.raise_()
+        return True
+
+    def image_needs_tiling(self):
+        if not self.image_path:
+            return False
+        size = QImageReader(self.image_path).size()
+        return size.isValid() and needs_tiling(size.width(), size.height())
+
+    def start_tiled_worker(self, text, model):
+        print("Using tiled analysis")
+        # History without the question just appended; the reducer adds it back
+        generator = TiledWorker(self.image_path, text, self.memory[:-1], model, [None] + self.OLLAMA_HOSTS)
         generator.finished.connect(self.finished)
         generator.error.connect(self.show_error_message)
         generator.partial.connect(self.stream_chunk)
-        # Buffer for streaming assistant output
-        self._streaming_ai_buffer = ""
-        self._streaming_last_ai_html = None
+        generator.progress.connect(lambda done, total: self.loading_label.setText(f"⏳ {done}/{total}"))
+        self._assistant_item_started = False
+        self._routed = None
+        generator.start()
+        self.worker_reference = generator
+
+    def session_for(self, model):
+        # A new model cannot reuse the old prefill, so it starts a new session
+        model = model or DEFAULT_MODEL
+        if self.chat_session is None or not self.chat_session.matches(model):
+            self.chat_session = ChatSession(model)
+        return self.chat_session
+
+    def start_worker(self, model):
+        generator = Worker_Local(self.memory, self.LLM_API_MODEL, model, session=self.session_for(model))
+        generator.finished.connect(self.finished)
+        generator.error.connect(self.show_error_message)
+        generator.partial.connect(self.stream_chunk)
+        follow_up = len(self.memory) > 2
+        generator.stats.connect(lambda stats: self.record_model_stats(stats, follow_up))
+        # The first streamed chunk starts a new assistant item
+        self._assistant_item_started = False
         generator.start()
         print("Worker started")
         self.worker_reference = generator
 
+    def image_megapixels(self):
+        if not self.image_path:
+            return None
+        # Reads only the header, not the pixels
+        size = QImageReader(self.image_path).size()
+        return size.width() * size.height() / 1e6 if size.isValid() else None
+
+    def route_question(self, text):
+        router = get_router()
+        model, kind, predicted = router.route(
+            text, self.installed_models, self.image_megapixels(),
+            self.latency_target_spin.value(), follow_up=len(self.memory) > 2)
+        model = model or DEFAULT_MODEL
+        self._routed = {'model': model, 'kind': kind, 'stepped': False}
+        estimate = f", ~{predicted:.1f}s" if predicted is not None else ""
+        print(f"Auto routing: {kind} question -> {model}{estimate}")
+        self.loading_label.setToolTip(f"{model} ({kind}{estimate})")
+        return model
+
+    def record_model_stats(self, stats, follow_up):
+        get_router().record(stats['model'], stats['ttft'], stats['decode_rate'], self.image_megapixels(),
+                            follow_up)
+
     def stream_chunk(self, chunk):
-        import markdown
-        if not hasattr(self, '_streaming_ai_buffer'):
-            self._streaming_ai_buffer = ""
-        if not hasattr(self, '_assistant_label_shown'):
-            self._assistant_label_shown = False
-        self._streaming_ai_buffer += chunk
-        paragraphs = self._streaming_ai_buffer.split('\n\n')
-        for para in paragraphs[:-1]:
-            # Inject CSS for list padding to prevent number cut-off
-            css_padding = "<style>ol, ul { padding-left: 2em !important; }</style>"
-            if not self._assistant_label_shown:
-                html = (
-                    css_padding +
-                    "<div style='background-color: #333333; margin: 4px 0; padding: 8px; border-radius: 6px;'>"
-                    "<b style='color: #6a9eda;'>ASSISTANT</b>: "
-                    f"<span style='color: #e0e0e0;'>{markdown.markdown(para)}</span></div>"
-                )
-                self._assistant_label_shown = True
-            else:
-                html = (
-                    css_padding +
-                    "<div style='background-color: #333333; margin: 4px 0; padding: 8px; border-radius: 6px;'>"
-                    f"<span style='color: #e0e0e0;'>{markdown.markdown(para)}</span></div>"
-                )
-            self.conversation.append(html)
-            self._streaming_last_ai_block_number = self.conversation.document().blockCount() - 1
-        self._streaming_ai_buffer = paragraphs[-1]
-        self.conversation.ensureCursorVisible()
+        if not self._assistant_item_started:
+            self.conversation.append_message(AI_ROLE, chunk)
+            self._assistant_item_started = True
+        else:
+            self.conversation.append_to_last(chunk)
 
     def finished(self, response):
-        import markdown
-        # On finish, flush any remaining buffer
+        routed = self._routed
+        if routed and self.ROUTING_STEP_UP and not routed['stepped'] \
+                and get_router().is_poor(routed['kind'], response):
+            larger = get_router().step_up(routed['model'], self.installed_models)
+            if larger:
+                # Retry with the next larger model; the poor answer stays out of memory
+                routed['stepped'] = True
+                routed['model'] = larger
+                print(f"Auto routing: weak answer, stepping up to {larger}")
+                self.update_conversation(f"*Retrying with {larger}...*", AI_ROLE)
+                self.start_worker(larger)
+                return
+        self.loading_label.setText("")
+        if not self._assistant_item_started and response:
+            self.conversation.append_message(AI_ROLE, response)
+        self.memory.append({'role': AI_ROLE, 'content': response})
+
+    def set_fanout_models(self, models):
+        selected = {action.text() for action in self.fanout_models_menu.actions() if action.isChecked()}
+        self.fanout_models_menu.clear()
+        for model in models:
+            action = self.fanout_models_menu.addAction(model)
+            action.setCheckable(True)
+            action.setChecked(model in selected)
+
+    def fanout_targets(self, text):
+        models = [action.text() for action in self.fanout_models_menu.actions() if action.isChecked()]
+        if not models:
+            model = self.ollama_model_combo.currentText()
+            models = [self.route_question(text) if model == AUTO_MODEL else model]
+        # The local server (None) plus any configured extra hosts
+        hosts = [None] + self.OLLAMA_HOSTS
+        return [(model, host) for model in models for host in hosts]
+
+    def start_fanout(self, text, mode):
+        targets = self.fanout_targets(text)
+        # Fan-out answers are never retried on a larger model
+        self._routed = None
+        # Drop finished runs; cancelled workers may still be draining a chunk
+        self.fanout_controllers = [
+            controller for controller in self.fanout_controllers
+            if any(worker.isRunning() for worker in controller.workers)
+        ]
+        for controller in self.fanout_controllers:
+            controller.cancel()
+        controller = FanoutController(targets, self.memory, self.LLM_API_MODEL, mode, self)
+        self.fanout_controllers.append(controller)
+        self._assistant_item_started = False
+        self._fanout_answered = False
+
+        if mode == COMPARE:
+            if self.fanout_window is None:
+                self.fanout_window = FanoutWindow(self)
+            self.fanout_window.attach(controller, text)
+            self.fanout_window.show()
+            self.fanout_window.raise_()
+            # The first finished answer becomes the conversation's reply
+            controller.target_finished.connect(
+                lambda index, response: self.adopt_fanout_answer(controller, index, response))
+        else:
+            controller.winner.connect(
+                lambda index: self.loading_label.setToolTip(target_name(controller.targets[index])))
+            controller.target_partial.connect(
+                lambda index, chunk: self.on_hedged_partial(controller, index, chunk))
+            controller.target_finished.connect(
+                lambda index, response: self.on_hedged_finished(controller, index, response))
+        controller.target_error.connect(lambda index, error: self.on_fanout_error(controller, index, error))
+        controller.all_done.connect(lambda: self.on_fanout_done(controller))
+        controller.start()
+
+    def adopt_fanout_answer(self, controller, index, response):
+        if self._fanout_answered or controller is not self.fanout_controllers[-1]:
+            return
+        self._fanout_answered = True
+        self.update_conversation(f"**{target_name(controller.targets[index])}**\n\n{response}", AI_ROLE)
         self.loading_label.setText("")
         self.memory.append({'role': AI_ROLE, 'content': response})
-        self.conversation.ensureCursorVisible()
+
+    def on_hedged_partial(self, controller, index, chunk):
+        # Only the first-token winner streams live into the conversation
+        if controller.mode == HEDGE_FIRST_TOKEN and index == controller.winner_index:
+            self.stream_chunk(chunk)
+
+    def on_hedged_finished(self, controller, index, response):
+        if index != controller.winner_index or self._fanout_answered:
+            return
+        self._fanout_answered = True
+        if controller.mode == HEDGE_FIRST_FINISH:
+            self.stream_chunk(response)
+        self.finished(response)
+
+    def on_fanout_error(self, controller, index, error):
+        if controller.mode != COMPARE and index == controller.winner_index:
+            self.loading_label.setText("")
+            self.show_error_message(f"{target_name(controller.targets[index])}: {error}")
+
+    def on_fanout_done(self, controller):
+        if controller is self.fanout_controllers[-1] and not self._fanout_answered:
+            self.loading_label.setText("")
+            if controller.winner_index is None:
+                self.show_error_message("No model produced an answer")
 
     def show_message(self, message):
         message_box = QMessageBox()
@@ -510,26 +816,18 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         error_message.exec_()
         
     def update_conversation(self, text, role):
-        markdown_text = markdown.markdown(text) if role == AI_ROLE else text
-    
-        # Inject CSS for list padding to prevent number cut-off
-        css_padding = "<style>ol, ul { padding-left: 2em !important; }</style>"
-        # Apply better styling to conversation messages
-        if role == USER_ROLE:
-            self.conversation.append(css_padding + f"<div style='background-color: #2d5c8a; margin: 4px 0; padding: 8px; border-radius: 6px;'>"
-                               f"<b style='color: #ffffff;'>{role.upper()}</b>: "
-                               f"<span style='color: #e0e0e0;'>{markdown_text}</span></div>")
-        else:
-            self.conversation.append(css_padding + f"<div style='background-color: #333333; margin: 4px 0; padding: 8px; border-radius: 6px;'>"
-                               f"<b style='color: #6a9eda;'>{role.upper()}</b>: "
-                               f"<span style='color: #e0e0e0;'>{markdown_text}</span></div>")
-    
-        self.conversation.ensureCursorVisible()
+        self.conversation.append_message(role, text)
 
     def image_to_base64(self):
         with open(self.image_path, "rb") as image_file:
             return base64.b64encode(image_file.read()).decode("utf-8")
 
+    def is_busy(self):
+        worker = getattr(self, 'worker_reference', None)
+        if worker is not None and worker.isRunning():
+            return True
+        return any(worker.isRunning() for controller in self.fanout_controllers for worker in controller.workers)
+
     def closeEvent(self, event):
         event.ignore()
         self.hide()
@@ -543,7 +841,7 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
 
     def get_ollama_models(self):
         try:
-            response = requests.get('http://localhost:11434/api/tags')
+            response = requests.get(f'{OLLAMA_URL}/api/tags')
             if response.status_code == 200:
                 data = response.json()
                 if 'models' in data:
@@ -557,14 +855,17 @@ class ScreenshotAnalyzer(QMainWindow, Ui_MainWindow):
         current_model = self.ollama_model_combo.currentText()
         self.ollama_model_combo.clear()
         models = self.get_ollama_models()
+        self.installed_models = models
+        get_router().refresh_sizes_in_background()
         if models:
-            self.ollama_model_combo.addItems(models)
-            if current_model in models:
+            self.ollama_model_combo.addItems([AUTO_MODEL] + models)
+            if current_model in models or current_model == AUTO_MODEL:
                 self.ollama_model_combo.setCurrentText(current_model)
             elif self.LLM_MODEL_ID and self.LLM_MODEL_ID in models:
                 self.ollama_model_combo.setCurrentText(self.LLM_MODEL_ID)
             else:
                 self.ollama_model_combo.setCurrentText(models[0])
+            self.set_fanout_models(models)
 
     def setShortcut(self):
         # Set Ctrl+Q as a quit shortcut
@@ -0,0 +1,103 @@
+import os
+import time
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtGui import QImage
+from modules import archive
+from modules.archive import ScreenshotArchive, DAY
+
+OLD = time.time() - 10 * DAY
+
+
+@pytest.fixture
+def folders(tmp_path, monkeypatch):
+    # Every rule off unless a test turns it on
+    for name in ("WATCHED_RETENTION_DAYS", "ARCHIVE_COMPACT_DAYS", "ARCHIVE_RETENTION_DAYS", "ARCHIVE_MAX_MB"):
+        monkeypatch.setattr(archive, name, 0)
+    folders = {name: tmp_path / name for name in ("archive", "Screenshots", "Documents")}
+    for folder in folders.values():
+        folder.mkdir()
+    return folders
+
+
+def capture(folder, name, color=0xff336699, mtime=None):
+    image = QImage(32, 16, QImage.Format_RGB32)
+    image.fill(color)
+    path = str(folder / name)
+    assert image.save(path, "PNG")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def rows(screenshot_archive):
+    return {sha1: (path, compacted) for sha1, path, _, compacted in screenshot_archive.all_rows()}
+
+
+def test_compaction_only_touches_the_watched_folder(folders, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_COMPACT_DAYS", 1)
+    screenshot_archive = ScreenshotArchive(str(folders["archive"]))
+    watched = capture(folders["Screenshots"], "shot.png", mtime=OLD)
+    opened = capture(folders["Documents"], "diagram.png", color=0xff00ff00, mtime=OLD)
+    watched_sha1 = screenshot_archive.index(watched, "a")
+    opened_sha1 = screenshot_archive.index(opened, "b")
+
+    screenshot_archive.maintain(str(folders["Screenshots"]))
+
+    assert not os.path.exists(watched)
+    compacted_path, compacted = rows(screenshot_archive)[watched_sha1]
+    assert compacted == 1
+    assert compacted_path == os.path.join(screenshot_archive.originals_dir, f"{watched_sha1}.jpg")
+    assert os.path.isfile(compacted_path)
+    assert os.path.isfile(opened)
+    assert rows(screenshot_archive)[opened_sha1] == (os.path.abspath(opened), 0)
+
+
+def test_watched_retention(folders, monkeypatch):
+    monkeypatch.setattr(archive, "WATCHED_RETENTION_DAYS", 1)
+    screenshot_archive = ScreenshotArchive(str(folders["archive"]))
+    analyzed = capture(folders["Screenshots"], "analyzed.png", mtime=OLD)
+    analyzed_sha1 = screenshot_archive.index(analyzed, "a")
+    unanalyzed = capture(folders["Screenshots"], "unanalyzed.png", color=0xff00ff00, mtime=OLD)
+    recent = capture(folders["Screenshots"], "recent.png", color=0xff0000ff)
+    notes = folders["Screenshots"] / "notes.txt"
+    notes.write_text("not an image")
+    os.utime(notes, (OLD, OLD))
+    elsewhere = capture(folders["Documents"], "old.png", mtime=OLD)
+
+    screenshot_archive.maintain(str(folders["Screenshots"]))
+
+    assert not os.path.exists(analyzed)
+    assert os.path.isfile(rows(screenshot_archive)[analyzed_sha1][0])
+    assert not os.path.exists(unanalyzed)
+    assert os.path.isfile(recent)
+    assert notes.exists()
+    assert os.path.isfile(elsewhere)
+
+
+def test_size_limit_evicts_oldest_first(folders, monkeypatch):
+    monkeypatch.setattr(archive, "ARCHIVE_MAX_MB", 1)
+    screenshot_archive = ScreenshotArchive(str(folders["archive"]))
+    entries = []
+    for age, color in enumerate((0xff111111, 0xff222222, 0xff333333)):
+        path = capture(folders["Documents"], f"{age}.png", color=color)
+        sha1 = screenshot_archive.index(path, "s")
+        thumbnail = os.path.join(screenshot_archive.thumbnail_dir, f"{sha1}.jpg")
+        with open(thumbnail, "wb") as thumbnail_file:
+            thumbnail_file.write(b"\0" * 400_000)
+        screenshot_archive.execute("UPDATE captures SET thumbnail = ?, analyzed_at = ? WHERE sha1 = ?",
+                                   (thumbnail, 1000 + age, sha1))
+        entries.append((path, sha1, thumbnail))
+
+    screenshot_archive.maintain(str(folders["Screenshots"]))
+
+    (oldest_path, oldest_sha1, oldest_thumbnail), *kept = entries
+    assert oldest_sha1 not in rows(screenshot_archive)
+    assert not os.path.exists(oldest_thumbnail)
+    # Originals outside the archive are never removed
+    assert os.path.isfile(oldest_path)
+    for path, sha1, thumbnail in kept:
+        assert sha1 in rows(screenshot_archive)
+        assert os.path.isfile(thumbnail)
@@ -0,0 +1,87 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage
+from modules.capture_diff import (changed_region, follow_up_region, same_size, _first_difference, _last_difference,
+                                  DIFF_MARGIN)
+
+BACKGROUND = 0xff202020
+CHANGED = 0xffff0000
+
+
+def make_image(width=64, height=48):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(BACKGROUND)
+    return image
+
+
+def test_first_and_last_difference():
+    assert _first_difference(b"abcdef", b"abXdef") == 2
+    assert _last_difference(b"abcdef", b"abXdef") == 2
+    assert _first_difference(b"abcdef", b"XbcdeY") == 0
+    assert _last_difference(b"abcdef", b"XbcdeY") == 5
+    assert _first_difference(b"abcdef", b"aXcYef") == 1
+    assert _last_difference(b"abcdef", b"aXcYef") == 3
+
+
+def test_identical_images():
+    assert changed_region(make_image(), make_image()) is None
+
+
+def test_single_changed_pixel():
+    new = make_image()
+    new.setPixel(10, 7, CHANGED)
+    assert changed_region(make_image(), new) == QRect(10, 7, 1, 1)
+
+
+def test_changes_at_the_corners():
+    new = make_image()
+    new.setPixel(0, 0, CHANGED)
+    new.setPixel(63, 47, CHANGED)
+    assert changed_region(make_image(), new) == QRect(0, 0, 64, 48)
+
+
+def test_bounding_box_spans_rows():
+    new = make_image()
+    new.setPixel(0, 20, CHANGED)
+    new.setPixel(63, 30, CHANGED)
+    new.setPixel(30, 25, CHANGED)
+    assert changed_region(make_image(), new) == QRect(0, 20, 64, 11)
+
+
+def test_odd_width():
+    new = make_image(width=37, height=5)
+    new.setPixel(36, 4, CHANGED)
+    assert changed_region(make_image(width=37, height=5), new) == QRect(36, 4, 1, 1)
+
+
+def save(image, path):
+    assert image.save(str(path), "PNG")
+    return str(path)
+
+
+def test_same_size_reads_headers(tmp_path):
+    old = save(make_image(), tmp_path / "old.png")
+    assert same_size(old, save(make_image(), tmp_path / "same.png"))
+    assert not same_size(old, save(make_image(width=65), tmp_path / "wider.png"))
+    assert not same_size(old, str(tmp_path / "missing.png"))
+
+
+def test_follow_up_region_is_padded_and_clipped(tmp_path):
+    old = save(make_image(), tmp_path / "old.png")
+    changed = make_image()
+    changed.setPixel(2, 40, CHANGED)
+    region, new_image = follow_up_region(old, save(changed, tmp_path / "new.png"))
+    assert region == QRect(0, 40 - DIFF_MARGIN, 2 + DIFF_MARGIN + 1, 48 - (40 - DIFF_MARGIN))
+    assert new_image.size() == changed.size()
+
+
+def test_follow_up_region_rejects_other_captures(tmp_path):
+    old = save(make_image(), tmp_path / "old.png")
+    assert follow_up_region(old, save(make_image(width=65), tmp_path / "wider.png")) == (None, None)
+    assert follow_up_region(old, save(make_image(), tmp_path / "same.png")) == (None, None)
+    everything = make_image()
+    everything.fill(CHANGED)
+    assert follow_up_region(old, save(everything, tmp_path / "all.png")) == (None, None)
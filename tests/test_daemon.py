@@ -0,0 +1,79 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("ollama")
+
+from modules import daemon
+from modules.daemon import ApiServer
+
+
+@pytest.fixture
+def api(monkeypatch):
+    requests_seen = []
+
+    def fake_stream_chat(memory, model, host=None, client=None):
+        requests_seen.append({'memory': memory, 'model': model})
+        for content in ("A ", "window", ""):
+            yield {'message': {'role': 'assistant', 'content': content}}
+
+    monkeypatch.setattr(daemon, "stream_chat", fake_stream_chat)
+    server = ApiServer(port=0)
+    server.start()
+    server.requests_seen = requests_seen
+    server.url = f"http://127.0.0.1:{server.httpd.server_address[1]}/analyze"
+    yield server
+    server.stop()
+
+
+def post(url, body, headers=None):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    request = urllib.request.Request(url, data=data, headers=headers or {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, [json.loads(line) for line in response.read().splitlines() if line]
+    except urllib.error.HTTPError as error:
+        return error.code, [json.loads(error.read())]
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "capture.png"
+    path.write_bytes(b"png bytes")
+    return str(path)
+
+
+def test_browser_requests_are_rejected(api, image):
+    status, _ = post(api.url, {'image_path': image, 'prompt': 'What is this?'},
+                     {'Content-Type': 'application/json', 'Origin': 'https://example.com'})
+    assert status == 403
+    assert api.requests_seen == []
+
+
+def test_non_json_bodies_are_rejected(api, image):
+    status, _ = post(api.url, {'image_path': image, 'prompt': 'What is this?'}, {'Content-Type': 'text/plain'})
+    assert status == 415
+    assert api.requests_seen == []
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    {'image_path': None, 'prompt': 'What is this?'},
+    {'image_base64': 'cG5n'},
+    {'image_path': '/no/such/capture.png', 'prompt': 'What is this?'},
+])
+def test_invalid_requests(api, body):
+    status, lines = post(api.url, body)
+    assert status == 400
+    assert 'error' in lines[0]
+    assert api.requests_seen == []
+
+
+def test_streams_ndjson(api, image):
+    status, lines = post(api.url, {'image_path': image, 'prompt': 'What is this?', 'model': 'llava:7b'})
+    assert status == 200
+    assert lines == [{'content': 'A '}, {'content': 'window'}, {'done': True, 'response': 'A window'}]
+    assert api.requests_seen[0]['model'] == 'llava:7b'
+    assert api.requests_seen[0]['memory'][-1] == {'role': 'user', 'content': 'What is this?', 'images': [image]}
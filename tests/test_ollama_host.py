@@ -0,0 +1,20 @@
+import pytest
+
+from modules.ollama_host import parse_host
+
+
+@pytest.mark.parametrize("host, url", [
+    (None, "http://127.0.0.1:11434"),
+    ("", "http://127.0.0.1:11434"),
+    ("localhost", "http://localhost:11434"),
+    ("0.0.0.0", "http://0.0.0.0:11434"),
+    ("0.0.0.0:8080", "http://0.0.0.0:8080"),
+    (":11500", "http://127.0.0.1:11500"),
+    ("http://box1", "http://box1:80"),
+    ("https://box1", "https://box1:443"),
+    ("http://box1:11434/", "http://box1:11434"),
+    ("https://example.com/ollama/", "https://example.com:443/ollama"),
+    ("[::1]:11434", "http://[::1]:11434"),
+])
+def test_parse_host(host, url):
+    assert parse_host(host) == url
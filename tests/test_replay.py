@@ -0,0 +1,70 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+
+pytest.importorskip("requests")
+
+from modules.replay import start_replay_server
+
+CHUNKS = [
+    {'model': 'gemma3:latest', 'message': {'role': 'assistant', 'content': 'A '}, 'done': False},
+    {'model': 'gemma3:latest', 'message': {'role': 'assistant', 'content': 'window'}, 'done': False},
+    {'model': 'gemma3:latest', 'message': {'role': 'assistant', 'content': ''}, 'done': True, 'eval_count': 2},
+]
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    fixture = {
+        'path': '/api/chat', 'model': 'gemma3:latest', 'stream': True, 'status': 200,
+        'chunks': [{'t': 0.01 * index, 'data': json.dumps(chunk)} for index, chunk in enumerate(CHUNKS)],
+    }
+    (tmp_path / "chat.json").write_text(json.dumps(fixture))
+    return str(tmp_path)
+
+
+def post_chat(server, stream=True):
+    body = json.dumps({'model': 'gemma3:latest', 'messages': [], 'stream': stream}).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}/api/chat", data=body,
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return [json.loads(line) for line in response.read().splitlines() if line]
+
+
+def test_replays_recorded_chunks(fixture_dir):
+    server = start_replay_server(fixture_dir=fixture_dir, speed=0)
+    try:
+        assert server.models() == ['gemma3:latest']
+        assert post_chat(server) == CHUNKS
+    finally:
+        server.shutdown()
+
+
+def test_non_streaming_request_gets_one_message(fixture_dir):
+    server = start_replay_server(fixture_dir=fixture_dir, speed=0)
+    try:
+        lines = post_chat(server, stream=False)
+        assert len(lines) == 1
+        assert lines[0]['message']['content'] == 'A window'
+        assert lines[0]['done'] is True
+    finally:
+        server.shutdown()
+
+
+def test_injected_errors(fixture_dir):
+    server = start_replay_server(fixture_dir=fixture_dir, speed=0, error_rate=1.0)
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post_chat(server)
+        assert error.value.code == 500
+    finally:
+        server.shutdown()
+
+
+def test_aborted_stream_stops_halfway(fixture_dir):
+    server = start_replay_server(fixture_dir=fixture_dir, speed=0, abort_rate=1.0)
+    try:
+        assert post_chat(server) == CHUNKS[:1]
+    finally:
+        server.shutdown()
@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("ollama")
+pytest.importorskip("requests")
+
+from modules import routing
+from modules.routing import ModelRouter, classify_question
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    # No tuning profiles and no Ollama server involved
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ModelRouter, "refresh_sizes", lambda self: self.sizes)
+    monkeypatch.setattr(routing, "EXPLORE_RATE", 0.0)
+    router = ModelRouter(path=str(tmp_path / "routing_stats.json"))
+    router.sizes = {'small': 1, 'large': 10, 'new': 5}
+    router.stats = {
+        'small': {'ttft': 1.0, 'decode_rate': 50.0, 'megapixels': 1.0, 'samples': 3},
+        'large': {'ttft': 2.0, 'decode_rate': 20.0, 'megapixels': 1.0, 'samples': 3},
+    }
+    return router
+
+
+def test_classify_question():
+    assert classify_question("What does the button say?") == 'quick'
+    assert classify_question("Why does this code throw an error?") == 'deep'
+    assert classify_question("Describe this window") == 'normal'
+
+
+def test_largest_model_within_target(router):
+    # normal: small 1 + 200/50 = 5 s, large 2 + 200/20 = 12 s
+    assert router.route("Describe this window", ['small', 'large'], target=15)[0] == 'large'
+    assert router.route("Describe this window", ['small', 'large'], target=8)[0] == 'small'
+
+
+def test_fastest_when_nothing_fits(router):
+    assert router.route("Describe this window", ['small', 'large'], target=1)[0] == 'small'
+
+
+def test_quick_questions_take_the_fastest(router):
+    assert router.route("What does the button say?", ['small', 'large'], target=60)[0] == 'small'
+
+
+def test_unmeasured_models(router, monkeypatch):
+    assert router.route("Describe this window", ['small', 'large', 'new'], target=60)[0] == 'large'
+    monkeypatch.setattr(routing, "EXPLORE_RATE", 1.0)
+    assert router.route("Describe this window", ['small', 'large', 'new'], target=60)[0] == 'new'
+    assert router.route("Describe this window", ['new'], target=60)[0] == 'new'
+
+
+def test_follow_ups_do_not_lower_first_turn_ttft(router):
+    router.record('large', 0.2, 20.0, 1.0, follow_up=True)
+    assert router.stats['large']['ttft'] == 2.0
+    assert router.stats['large']['follow_up_ttft'] == pytest.approx(0.2)
+    assert router.predict('large', 'normal', 1.0, follow_up=True) == pytest.approx(0.2 + 10)
+    assert router.predict('large', 'normal', 1.0) == pytest.approx(2.0 + 10)
+
+
+def test_no_models(router):
+    assert router.route("Describe this window", [], target=8) == (None, 'normal', None)
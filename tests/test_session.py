@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("ollama")
+
+from modules.session import ChatSession
+
+
+def final_chunk(prompt_eval_count, eval_count):
+    return {'done': True, 'prompt_eval_count': prompt_eval_count, 'eval_count': eval_count}
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    # No tuning profile for the model
+    monkeypatch.chdir(tmp_path)
+    return ChatSession("gemma3:latest")
+
+
+def test_follow_up_served_from_cache(session):
+    session.observe(final_chunk(1000, 100))
+    assert session.context_tokens == 1100
+    assert session.last_reused is None
+    session.observe(final_chunk(20, 50))
+    assert session.last_reused is True
+    assert session.context_tokens == 1170
+
+
+def test_evicted_cache_prefills_everything(session):
+    session.observe(final_chunk(1000, 100))
+    session.observe(final_chunk(1130, 40))
+    assert session.last_reused is False
+    assert session.context_tokens == 1170
+
+
+def test_missing_final_chunk(session):
+    session.observe(None)
+    assert session.turns == 1
+    assert session.context_tokens == 0
+
+
+def test_images_are_encoded_once(session, tmp_path):
+    image = tmp_path / "capture.png"
+    image.write_bytes(b"png bytes")
+    memory = [{'role': 'user', 'content': 'What is this?', 'images': [str(image)]}]
+    first = session.messages(memory)
+    image.write_bytes(b"changed")
+    assert session.messages(memory) == first
+    assert first[0]['images'] == ["cG5nIGJ5dGVz"]
+    assert memory[0]['images'] == [str(image)]
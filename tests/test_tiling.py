@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("ollama")
+
+from modules.tiling import tile_rects
+
+
+def covered(rects, width, height):
+    pixels = set()
+    for rect in rects:
+        for y in range(rect.y(), rect.y() + rect.height()):
+            for x in range(rect.x(), rect.x() + rect.width()):
+                pixels.add((x, y))
+    return pixels == {(x, y) for y in range(height) for x in range(width)}
+
+
+def test_small_image_is_one_tile():
+    rects = tile_rects(800, 600, tile_size=1024, overlap=128)
+    assert [(rect.x(), rect.y(), rect.width(), rect.height()) for rect in rects] == [(0, 0, 800, 600)]
+
+
+def test_tiles_cover_the_image_within_bounds():
+    width, height = 300, 170
+    rects = tile_rects(width, height, tile_size=100, overlap=20)
+    assert covered(rects, width, height)
+    for rect in rects:
+        assert rect.x() >= 0 and rect.y() >= 0
+        assert rect.x() + rect.width() <= width
+        assert rect.y() + rect.height() <= height
+        assert rect.width() <= 100 and rect.height() <= 100
+
+
+def test_neighbouring_tiles_overlap():
+    rects = tile_rects(250, 100, tile_size=100, overlap=20)
+    xs = sorted({rect.x() for rect in rects})
+    assert xs == [0, 80, 160]
+    assert rects[0].x() + rects[0].width() - rects[1].x() == 20
+
+
+def test_exact_fit_has_no_sliver():
+    rects = tile_rects(1024, 1024, tile_size=1024, overlap=128)
+    assert len(rects) == 1
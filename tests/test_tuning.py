@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("ollama")
+pytest.importorskip("requests")
+
+from modules.tuning import NUM_CTX, candidate_options, generation_kwargs, load_profiles, save_profiles
+
+
+def test_context_size_is_not_tuned():
+    candidates = list(candidate_options(64))
+    assert len(candidates) > 1
+    assert {options['num_ctx'] for options in candidates} == {NUM_CTX}
+
+
+def test_profiles_reload_after_save(tmp_path):
+    path = str(tmp_path / "tuning_profiles.json")
+    assert load_profiles(path) == {}
+    save_profiles({'gemma3:latest': {'options': {'num_thread': 4}, 'keep_alive': '30m'}}, path)
+    assert load_profiles(path) is load_profiles(path)
+    assert generation_kwargs('gemma3:latest', path=path) == {'options': {'num_thread': 4}, 'keep_alive': '30m'}
+    assert generation_kwargs('gemma3:latest', host='http://box1:11434', path=path) == {}